@@ -1,9 +1,13 @@
 from django.contrib import admin
-from .models import Earthquake, DuplicateLink, IntensityCurve, Country, Plate, SyncState
+from .models import Earthquake, DuplicateLink, IntensityCurve, Country, Plate, SyncState, DailyRegionStat, MagnitudeBinStat, LargestEvent, FilterValue
 
 admin.site.register(Earthquake)
 admin.site.register(IntensityCurve)
 admin.site.register(DuplicateLink)
 admin.site.register(Country)
 admin.site.register(Plate)
-admin.site.register(SyncState)
\ No newline at end of file
+admin.site.register(SyncState)
+admin.site.register(DailyRegionStat)
+admin.site.register(MagnitudeBinStat)
+admin.site.register(LargestEvent)
+admin.site.register(FilterValue)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import math
+
+from django.contrib.gis.db.models import GeometryField
+from django.db.models import Avg, Count, F, FloatField, Func, Max, Min, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek
+from rest_framework.exceptions import ValidationError
+
+TIME_BUCKETS = {
+    "hour": TruncHour,
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+CATEGORY_FIELDS = ["tectonic_plate", "origin_country", "source"]
+GROUPINGS = ["grid", "hex", "time", *CATEGORY_FIELDS]
+
+MAX_CELL_SIZE = 90.0
+MIN_CELL_SIZE = 0.01
+
+HEX_CENTER_SQL = """
+CASE WHEN power(longitude - round(longitude / %s) * %s, 2) + power(latitude - round(latitude / %s) * %s, 2)
+        <= power(longitude - (floor(longitude / %s) + 0.5) * %s, 2) + power(latitude - (floor(latitude / %s) + 0.5) * %s, 2)
+     THEN round({axis} / %s) * %s
+     ELSE (floor({axis} / %s) + 0.5) * %s
+END
+"""
+
+def snapped_axis(axis, size):
+    point = Func(F("location"), template="%(expressions)s::geometry", output_field=GeometryField())
+    snapped = Func(point, Value(size), function="ST_SnapToGrid", output_field=GeometryField())
+    return Func(snapped, function=f"ST_{axis}", output_field=FloatField())
+
+def hex_axis(axis, size):
+    w, h = size * math.sqrt(3), size * 3
+    step = w if axis == "longitude" else h
+    return RawSQL(
+        HEX_CENTER_SQL.format(axis=axis),
+        (w, w, h, h, w, w, h, h, step, step, step, step),
+        output_field=FloatField(),
+    )
+
+def get_cell_size(params):
+    try:
+        size = float(params.get("cell_size", 1.0))
+    except ValueError:
+        raise ValidationError({"cell_size": "Must be a number of degrees."})
+    if not MIN_CELL_SIZE <= size <= MAX_CELL_SIZE:
+        raise ValidationError({"cell_size": f"Must be between {MIN_CELL_SIZE} and {MAX_CELL_SIZE} degrees."})
+    return size
+
+def aggregate_events(queryset, params):
+    group_by = params.get("group_by")
+    if group_by not in GROUPINGS:
+        raise ValidationError({"group_by": f"Choose one of: {', '.join(GROUPINGS)}"})
+
+    queryset = queryset.order_by()
+
+    if group_by in ("grid", "hex"):
+        size = get_cell_size(params)
+        if group_by == "grid":
+            keys = {"cell_lon": snapped_axis("X", size), "cell_lat": snapped_axis("Y", size)}
+        else:
+            keys = {"cell_lon": hex_axis("longitude", size), "cell_lat": hex_axis("latitude", size)}
+        queryset = queryset.exclude(location__isnull=True).annotate(**keys)
+        key_names = list(keys)
+    elif group_by == "time":
+        interval = params.get("interval", "day")
+        if interval not in TIME_BUCKETS:
+            raise ValidationError({"interval": f"Choose one of: {', '.join(TIME_BUCKETS)}"})
+        queryset = queryset.annotate(bucket=TIME_BUCKETS[interval]("origin_time"))
+        key_names = ["bucket"]
+    else:
+        key_names = [group_by]
+
+    rows = (
+        queryset.values(*key_names)
+        .annotate(
+            count=Count("id"),
+            max_magnitude=Max("magnitude"),
+            mean_magnitude=Avg("magnitude"),
+            min_depth_km=Min("depth_km"),
+            max_depth_km=Max("depth_km"),
+            mean_depth_km=Avg("depth_km"),
+        )
+        .order_by(*key_names)
+    )
+
+    buckets = []
+    for row in rows:
+        key = [row.pop(name) for name in key_names]
+        buckets.append({"key": key if len(key) > 1 else key[0], **row})
+
+    return {"group_by": group_by, "buckets": buckets}
@@ -0,0 +1,93 @@
+import hashlib
+import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .models import SyncState
+
+CATALOG_VERSION_KEY = "catalog_version"
+
+def get_catalog_version():
+    return SyncState.objects.filter(key=CATALOG_VERSION_KEY).values_list("last_run_at", flat=True).first()
+
+def bump_catalog_version(when=None):
+    when = when or datetime.datetime.now(datetime.UTC)
+    SyncState.objects.update_or_create(key=CATALOG_VERSION_KEY, defaults={"value": True, "last_run_at": when})
+    return when
+
+def normalize_query(query_params):
+    return "&".join(
+        f"{k}={v}"
+        for k in sorted(query_params)
+        for v in sorted(query_params.getlist(k))
+        if v != ""
+    )
+
+def get_version_token(version):
+    return str(int(version.timestamp() * 1_000_000)) if version is not None else "0"
+
+def get_cache_key(request, version):
+    material = "|".join([
+        request.method,
+        request.build_absolute_uri(request.path),
+        normalize_query(request.query_params),
+        request.accepted_renderer.format,
+    ])
+    digest = hashlib.sha256(material.encode("utf-8")).hexdigest()
+    return f"api:{get_version_token(version)}:{digest[:32]}"
+
+def get_etag(cache_key):
+    return quote_etag(hashlib.sha256(cache_key.encode("utf-8")).hexdigest()[:32])
+
+def is_not_modified(request, etag, version):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return etag in tags or "*" in tags
+
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return version is not None and if_modified_since is not None and int(version.timestamp()) <= if_modified_since
+
+def set_validators(response, etag, version):
+    response["ETag"] = etag
+    if version is not None:
+        response["Last-Modified"] = http_date(version.timestamp())
+    response["Cache-Control"] = "public, max-age=0, must-revalidate"
+    return response
+
+def catalog_cached(view_method):
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view_method(self, request, *args, **kwargs)
+
+        version = get_catalog_version()
+        key = get_cache_key(request, version)
+        etag = get_etag(key)
+
+        if is_not_modified(request, etag, version):
+            return set_validators(HttpResponseNotModified(), etag, version)
+
+        if request.accepted_renderer.format != "json":
+            return set_validators(view_method(self, request, *args, **kwargs), etag, version)
+
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return set_validators(HttpResponse(content, content_type=content_type), etag, version)
+
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = self.get_renderer_context()
+        response.render()
+        cache.set(key, (response.content, response["Content-Type"]), settings.API_CACHE_TIMEOUT)
+        return set_validators(response, etag, version)
+    return wrapper
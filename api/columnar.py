@@ -0,0 +1,138 @@
+import os
+import json
+import shutil
+import struct
+import tempfile
+import subprocess
+
+from django.http import FileResponse
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .export import column_name, stream_ndjson
+from .models import RawPayload
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+FIELD_TYPES = {
+    "id": pa.int64(),
+    "global_id": pa.string(),
+    "source_id": pa.string(),
+    "source": pa.string(),
+    "origin_time": TIMESTAMP,
+    "latitude": pa.float64(),
+    "longitude": pa.float64(),
+    "magnitude": pa.float64(),
+    "mag_type": pa.string(),
+    "depth_km": pa.float64(),
+    "place_name": pa.string(),
+    "origin_country": pa.string(),
+    "tectonic_plate": pa.string(),
+    "affected_countries": pa.list_(pa.string()),
+    "tsunami": pa.bool_(),
+    "has_curves": pa.bool_(),
+    "updated_time": TIMESTAMP,
+    "retrieved_time": TIMESTAMP,
+    "raw_data": pa.string(),
+    "duplicate_of": pa.int64(),
+}
+
+GEO_METADATA = {
+    "version": "1.0.0",
+    "primary_column": "geometry",
+    "columns": {
+        "geometry": {
+            "encoding": "WKB",
+            "geometry_types": ["Point"],
+            "crs": "OGC:CRS84",
+        }
+    },
+}
+
+def point_wkb(lon, lat):
+    if lon is None or lat is None:
+        return None
+    return struct.pack("<BIdd", 1, 1, lon, lat)
+
+def get_schema(fields):
+    columns = ["id"] + [f for f in fields if f not in ("id", "location")]
+    schema = pa.schema([(name, FIELD_TYPES[name]) for name in columns] + [("geometry", pa.binary())])
+    return schema.with_metadata({"geo": json.dumps(GEO_METADATA)}), columns
+
+def iter_batches(queryset, fields, batch_size=50000):
+    schema, columns = get_schema(fields)
+    values = ["longitude", "latitude"] + [column_name(name) for name in columns]
+
+    rows = []
+    for row in queryset.values_list(*values).iterator(chunk_size=batch_size):
+        rows.append(row)
+        if len(rows) >= batch_size:
+            yield build_batch(schema, columns, rows)
+            rows = []
+    if rows:
+        yield build_batch(schema, columns, rows)
+
+def build_batch(schema, columns, rows):
+    arrays = []
+    for i, name in enumerate(columns, start=2):
+        column = [row[i] for row in rows]
+        if name == "raw_data":
+            column = [RawPayload.decode(v) for v in column]
+        arrays.append(pa.array(column, type=FIELD_TYPES[name]))
+    arrays.append(pa.array([point_wkb(row[0], row[1]) for row in rows], type=pa.binary()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def write_parquet(queryset, fields, path, batch_size=50000):
+    schema, _ = get_schema(fields)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in iter_batches(queryset, fields, batch_size):
+            writer.write_batch(batch, row_group_size=batch_size)
+
+def write_arrow(queryset, fields, path, batch_size=50000):
+    schema, _ = get_schema(fields)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in iter_batches(queryset, fields, batch_size):
+            writer.write_batch(batch)
+
+def write_flatgeobuf(queryset, fields, path):
+    with tempfile.NamedTemporaryFile("w", suffix=".geojsonl", delete=False) as tmp:
+        for line in stream_ndjson(queryset, fields):
+            tmp.write(line)
+
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+        subprocess.run([
+            "ogr2ogr", "-f", "FlatGeobuf", path, tmp.name,
+            "-nln", "earthquakes", "-a_srs", "EPSG:4326",
+            "-lco", "SPATIAL_INDEX=YES",
+        ], check=True, capture_output=True)
+    finally:
+        os.remove(tmp.name)
+
+COLUMNAR_FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet", write_parquet),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow", write_arrow),
+    "fgb": ("application/octet-stream", "fgb", write_flatgeobuf),
+}
+
+def write_columnar(queryset, fields, output, path):
+    COLUMNAR_FORMATS[output][2](queryset, fields, path)
+
+def write_columnar_atomic(queryset, fields, output, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    write_columnar(queryset, fields, output, tmp_path)
+    shutil.move(tmp_path, path)
+
+def columnar_response(queryset, fields, output):
+    content_type, extension, _ = COLUMNAR_FORMATS[output]
+    fd, path = tempfile.mkstemp(suffix=f".{extension}")
+    os.close(fd)
+    try:
+        write_columnar(queryset, fields, output, path)
+        handle = open(path, "rb")
+    finally:
+        os.remove(path)
+    return FileResponse(handle, content_type=content_type, as_attachment=True, filename=f"earthquakes.{extension}")
@@ -0,0 +1,109 @@
+import csv
+import json
+import datetime
+from collections import OrderedDict
+
+from django.http import StreamingHttpResponse
+
+from .models import RawPayload
+
+EXPORT_FORMATS = {
+    "geojson": ("application/geo+json", "geojson"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+COLUMN_NAMES = {
+    "duplicate_of": "duplicate_of_id",
+    "raw_data": "raw_payload__data",
+}
+
+def column_name(field):
+    return COLUMN_NAMES.get(field, field)
+
+def to_primitive(value):
+    if isinstance(value, datetime.datetime):
+        value = value.astimezone(datetime.UTC).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+    return value
+
+def to_value(field, value):
+    if field == "raw_data":
+        return None if value is None else json.loads(RawPayload.decode(value))
+    return to_primitive(value)
+
+def get_record_columns(fields, pk="id"):
+    properties = [f for f in fields if f not in ("id", "location")]
+    return properties, [pk, "longitude", "latitude"] + [column_name(f) for f in properties]
+
+def make_feature(row, properties):
+    pk, lon, lat = row[:3]
+    return {
+        "id": pk,
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]} if lon is not None and lat is not None else None,
+        "properties": {f: to_value(f, v) for f, v in zip(properties, row[3:])},
+    }
+
+def iter_records(queryset, fields, chunk_size=2000):
+    properties, columns = get_record_columns(fields)
+
+    for row in queryset.values_list(*columns).iterator(chunk_size=chunk_size):
+        pk, lon, lat = row[:3]
+        yield pk, lon, lat, {f: to_value(f, v) for f, v in zip(properties, row[3:])}
+
+def iter_features(queryset, fields, chunk_size=2000):
+    properties, columns = get_record_columns(fields)
+    for row in queryset.values_list(*columns).iterator(chunk_size=chunk_size):
+        yield make_feature(row, properties)
+
+def feature_rows(queryset, fields):
+    properties, columns = get_record_columns(fields, pk="pk")
+    if "origin_time" not in properties:
+        columns.append("origin_time")
+    return properties, queryset.values_list(*columns, named=True)
+
+def feature_collection(rows, properties):
+    return OrderedDict([
+        ("type", "FeatureCollection"),
+        ("features", [make_feature(row, properties) for row in rows]),
+    ])
+
+def stream_geojson(queryset, fields):
+    yield '{"type": "FeatureCollection", "features": ['
+    separator = ""
+    for feature in iter_features(queryset, fields):
+        yield separator + json.dumps(feature, default=str)
+        separator = ","
+    yield "]}\n"
+
+def stream_ndjson(queryset, fields):
+    for feature in iter_features(queryset, fields):
+        yield json.dumps(feature, default=str) + "\n"
+
+class Echo:
+    def write(self, value):
+        return value
+
+def stream_csv(queryset, fields):
+    writer = csv.writer(Echo())
+    properties, _ = get_record_columns(fields)
+    yield writer.writerow(["id"] + properties)
+    for pk, _, _, record in iter_records(queryset, fields):
+        yield writer.writerow([pk] + [
+            json.dumps(record[f], default=str) if isinstance(record[f], (dict, list)) else record[f]
+            for f in properties
+        ])
+
+STREAMERS = {
+    "geojson": stream_geojson,
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+}
+
+def streaming_export(queryset, fields, output):
+    content_type, extension = EXPORT_FORMATS[output]
+    response = StreamingHttpResponse(STREAMERS[output](queryset, fields), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="earthquakes.{extension}"'
+    return response
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.export import feature_collection, feature_rows
+from api.models import Earthquake
+from api.serializers import EarthquakeListSerializer, LIST_FIELDS
+
+class Command(BaseCommand):
+    help = "Compare list rendering through EarthquakeListSerializer against the values_list fast path"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-sizes", default="10,100,1000", help="Comma-separated page sizes to benchmark")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per page size (best time is reported)")
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        queryset = Earthquake.objects.order_by("-origin_time")
+
+        for size in [int(s) for s in options["page_sizes"].split(",") if s.strip()]:
+            def serializer_path():
+                page = list(queryset[:size])
+                return renderer.render(EarthquakeListSerializer(page, many=True).data)
+
+            def fast_path():
+                properties, rows = feature_rows(queryset, LIST_FIELDS)
+                return renderer.render(feature_collection(list(rows[:size]), properties))
+
+            slow, slow_output = self.best_of(serializer_path, options["repeat"])
+            fast, fast_output = self.best_of(fast_path, options["repeat"])
+
+            status = "✓" if slow_output == fast_output else "!"
+            print(f"[{status}] page_size={size}: serializer {slow * 1000:.1f} ms | fast path {fast * 1000:.1f} ms | speedup x{slow / fast if fast else 0:.1f} | identical output: {slow_output == fast_output}")
+
+    def best_of(self, func, repeat):
+        best, output = None, None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
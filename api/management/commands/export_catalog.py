@@ -0,0 +1,60 @@
+import os
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.db.models.functions import TruncDate
+
+from api.columnar import COLUMNAR_FORMATS, write_columnar_atomic
+from api.models import ChangedDay, Earthquake, SyncState
+from api.statistics import get_changed_days
+from api.serializers import EARTHQUAKE_FIELDS, LIST_FIELDS
+
+class Command(BaseCommand):
+    help = "Write a columnar snapshot of the catalog (Parquet, Arrow IPC or FlatGeobuf)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Output file, or output directory with --partition-by-day")
+        parser.add_argument("--format", dest="output_format", choices=sorted(COLUMNAR_FORMATS), default="parquet")
+        parser.add_argument("--partition-by-day", action="store_true", help="Write one file per origin day under OUTPUT/date=YYYY-MM-DD/")
+        parser.add_argument("--incremental", action="store_true", help="With --partition-by-day, only rewrite days whose events were written, moved away or relinked since the last export")
+        parser.add_argument("--include-raw-data", action="store_true", help="Include the upstream raw_data payload as a JSON string column")
+
+    def handle(self, *args, **options):
+        output_format = options["output_format"]
+        fields = EARTHQUAKE_FIELDS if options["include_raw_data"] else LIST_FIELDS
+        extension = COLUMNAR_FORMATS[output_format][1]
+        queryset = Earthquake.objects.order_by("origin_time", "id")
+
+        if options["incremental"] and not options["partition_by_day"]:
+            raise CommandError("--incremental requires --partition-by-day")
+
+        if not options["partition_by_day"]:
+            write_columnar_atomic(queryset, fields, output_format, options["output"])
+            print(f"[✓] Snapshot written to {options['output']}")
+            return
+
+        state, _ = SyncState.objects.get_or_create(key=f"export_{output_format}")
+
+        if options["incremental"] and state.last_sync_end is not None:
+            days, new_mark = get_changed_days(state.last_sync_end)
+        else:
+            new_mark = ChangedDay.objects.aggregate(m=Max("changed_at"))["m"]
+            days = sorted(set(
+                Earthquake.objects.annotate(day=TruncDate("origin_time", tzinfo=datetime.UTC)).values_list("day", flat=True)
+            ))
+
+        for day in days:
+            start = datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.UTC)
+            path = os.path.join(options["output"], f"date={day.isoformat()}", f"part-0.{extension}")
+            write_columnar_atomic(
+                queryset.filter(origin_time__gte=start, origin_time__lt=start + datetime.timedelta(days=1)),
+                fields, output_format, path,
+            )
+
+        state.value = True
+        state.last_sync_end = new_mark
+        state.last_run_at = datetime.datetime.now(datetime.UTC)
+        state.save()
+
+        print(f"[✓] Wrote {len(days)} daily partition(s) to {options['output']}")
@@ -0,0 +1,227 @@
+import time
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api import partitioning
+from api.partitioning import GLOBAL_ID_FUNCTION_SQL, GLOBAL_ID_TABLE, GLOBAL_ID_TRIGGER, PARENT_TABLE, quote
+
+NEW_TABLE = f"{PARENT_TABLE}_partitioned"
+OLD_TABLE = f"{PARENT_TABLE}_unpartitioned"
+ID_SEQUENCE = f"{NEW_TABLE}_id_seq"
+CHANGE_TABLE = f"{PARENT_TABLE}_partition_changes"
+CHANGE_TRIGGER = f"{PARENT_TABLE}_partition_capture"
+LOCKED_DELTA = 1000
+
+CHANGE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO {changes} (earthquake_id) VALUES (OLD.id);
+        RETURN OLD;
+    END IF;
+    INSERT INTO {changes} (earthquake_id) VALUES (NEW.id);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+REPLAY_CHANGES_SQL = """
+DELETE FROM {changes} WHERE change_id IN (
+    SELECT change_id FROM {changes} ORDER BY change_id LIMIT %s
+)
+RETURNING earthquake_id
+"""
+
+class Command(BaseCommand):
+    help = (
+        "Convert the earthquake table into monthly partitions by origin_time, or create upcoming partitions when it already is. "
+        f"PostgreSQL cannot enforce unique(global_id) across partitions, so uniqueness moves to the {GLOBAL_ID_TABLE} "
+        "lookup table, kept in sync by a trigger. Foreign keys that reference earthquakes (duplicate links, intensity "
+        "curves, largest events) are dropped and only enforced by Django, so rows deleted outside the ORM can leave them dangling."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=partitioning.MONTHS_AHEAD, help="Future monthly partitions to keep created")
+        parser.add_argument("--chunk-size", type=int, default=50000, help="Rows copied per transaction while migrating")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between chunks to limit I/O pressure")
+
+    def handle(self, *args, **options):
+        if partitioning.is_partitioned():
+            created = partitioning.ensure_future_partitions(options["months_ahead"])
+            print(f"[✓] {PARENT_TABLE} is already partitioned ({len(created)} new partition(s) created)")
+            return
+
+        if self.table_exists(OLD_TABLE):
+            raise CommandError(f"{OLD_TABLE} already exists - drop it after verifying a previous migration before running again")
+
+        indexes = self.create_partitioned_table(options["months_ahead"])
+        self.capture_changes()
+        self.copy_chunks(options["chunk_size"], options["pause"])
+        self.catch_up(options["chunk_size"], options["pause"])
+        self.swap_tables(options["chunk_size"], indexes)
+
+        print(f"[✓] {PARENT_TABLE} is now partitioned by month; the original table was kept as {OLD_TABLE}")
+
+    def table_exists(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+            return cursor.fetchone()[0]
+
+    def get_index_definitions(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT i.relname, pg_get_indexdef(ix.indexrelid)
+                FROM pg_index ix
+                JOIN pg_class i ON i.oid = ix.indexrelid
+                JOIN pg_class t ON t.oid = ix.indrelid
+                WHERE t.relname = %s AND NOT ix.indisprimary AND NOT ix.indisunique
+                """,
+                [PARENT_TABLE],
+            )
+            return cursor.fetchall()
+
+    def create_partitioned_table(self, months_ahead):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT min(origin_time) FROM {quote(PARENT_TABLE)}")
+            first = cursor.fetchone()[0] or datetime.datetime.now(datetime.UTC)
+
+        last = partitioning.add_months(partitioning.month_start(datetime.datetime.now(datetime.UTC)), months_ahead)
+        indexes = []
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {quote(NEW_TABLE)} CASCADE")
+            cursor.execute(
+                f"CREATE TABLE {quote(NEW_TABLE)} (LIKE {quote(PARENT_TABLE)} INCLUDING DEFAULTS INCLUDING STORAGE) "
+                f"PARTITION BY RANGE (origin_time)"
+            )
+            cursor.execute(f"ALTER TABLE {quote(NEW_TABLE)} ADD PRIMARY KEY (id, origin_time)")
+            cursor.execute(f"CREATE SEQUENCE {quote(ID_SEQUENCE)} AS integer OWNED BY {quote(NEW_TABLE)}.id")
+            cursor.execute(f"ALTER TABLE {quote(NEW_TABLE)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [ID_SEQUENCE])
+
+            cursor.execute(f"DROP TABLE IF EXISTS {quote(GLOBAL_ID_TABLE)}")
+            cursor.execute(f"CREATE TABLE {quote(GLOBAL_ID_TABLE)} (global_id varchar(255) PRIMARY KEY, earthquake_id integer NOT NULL)")
+            cursor.execute(GLOBAL_ID_FUNCTION_SQL.format(function=quote(GLOBAL_ID_TRIGGER), registry=quote(GLOBAL_ID_TABLE)))
+            cursor.execute(
+                f"CREATE TRIGGER {quote(GLOBAL_ID_TRIGGER)} AFTER INSERT OR DELETE ON {quote(NEW_TABLE)} "
+                f"FOR EACH ROW EXECUTE FUNCTION {quote(GLOBAL_ID_TRIGGER)}()"
+            )
+
+            for name, definition in self.get_index_definitions():
+                temp_name = f"{name[:50]}_part"
+                definition = definition.replace(f"INDEX {name} ON", f"INDEX {temp_name} ON", 1)
+                definition = definition.replace(f"ON public.{PARENT_TABLE} ", f"ON public.{NEW_TABLE} ", 1)
+                definition = definition.replace(f"ON {PARENT_TABLE} ", f"ON {NEW_TABLE} ", 1)
+                cursor.execute(definition)
+                indexes.append((name, temp_name))
+
+            cursor.execute(f"CREATE INDEX {quote(NEW_TABLE + '_global_id')} ON {quote(NEW_TABLE)} (global_id)")
+            cursor.execute(f"CREATE TABLE {quote(PARENT_TABLE + '_default')} PARTITION OF {quote(NEW_TABLE)} DEFAULT")
+            created = partitioning.create_partitions(first, last, parent=NEW_TABLE)
+
+        print(f"[*] Created {NEW_TABLE} with {len(created)} monthly partition(s) and {len(indexes)} index(es)")
+        return indexes
+
+    def capture_changes(self):
+        parent, changes, trigger = quote(PARENT_TABLE), quote(CHANGE_TABLE), quote(CHANGE_TRIGGER)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {changes}")
+            cursor.execute(f"CREATE TABLE {changes} (change_id bigserial PRIMARY KEY, earthquake_id integer NOT NULL)")
+            cursor.execute(CHANGE_FUNCTION_SQL.format(function=trigger, changes=changes))
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {parent}")
+            cursor.execute(
+                f"CREATE TRIGGER {trigger} AFTER INSERT OR UPDATE OR DELETE ON {parent} "
+                f"FOR EACH ROW EXECUTE FUNCTION {trigger}()"
+            )
+        print(f"[*] Recording writes to {PARENT_TABLE} in {CHANGE_TABLE} while copying")
+
+    def replay_changes(self, cursor, chunk_size):
+        cursor.execute(REPLAY_CHANGES_SQL.format(changes=quote(CHANGE_TABLE)), [chunk_size])
+        ids = list({row[0] for row in cursor.fetchall()})
+        if ids:
+            cursor.execute(f"DELETE FROM {quote(NEW_TABLE)} WHERE id = ANY(%s)", [ids])
+            cursor.execute(f"INSERT INTO {quote(NEW_TABLE)} SELECT * FROM {quote(PARENT_TABLE)} WHERE id = ANY(%s)", [ids])
+        return len(ids)
+
+    def pending_changes(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {quote(CHANGE_TABLE)}")
+            return cursor.fetchone()[0]
+
+    def catch_up(self, chunk_size, pause):
+        while self.pending_changes() > LOCKED_DELTA:
+            with transaction.atomic(), connection.cursor() as cursor:
+                replayed = self.replay_changes(cursor, chunk_size)
+            print(f"[*] Replayed {replayed} row(s) changed during the copy")
+            if pause:
+                time.sleep(pause)
+
+    def copy_chunks(self, chunk_size, pause):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT coalesce(max(id), 0) FROM {quote(PARENT_TABLE)}")
+            max_id = cursor.fetchone()[0]
+
+        last_id = 0
+        while last_id < max_id:
+            upper = last_id + chunk_size
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {quote(NEW_TABLE)} SELECT * FROM {quote(PARENT_TABLE)} WHERE id > %s AND id <= %s",
+                    [last_id, upper],
+                )
+                copied = cursor.rowcount
+            last_id = upper
+            print(f"[*] Copied ids up to {min(last_id, max_id)} / {max_id} ({copied} rows in this chunk)")
+            if pause:
+                time.sleep(pause)
+
+    def swap_tables(self, chunk_size, indexes):
+        parent, new, old = quote(PARENT_TABLE), quote(NEW_TABLE), quote(OLD_TABLE)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {parent} IN ACCESS EXCLUSIVE MODE")
+
+            replayed = 0
+            while True:
+                count = self.replay_changes(cursor, chunk_size)
+                if not count:
+                    break
+                replayed += count
+            cursor.execute(f"DROP TRIGGER {quote(CHANGE_TRIGGER)} ON {parent}")
+            cursor.execute(f"DROP TABLE {quote(CHANGE_TABLE)}")
+            cursor.execute(f"DROP FUNCTION {quote(CHANGE_TRIGGER)}()")
+
+            cursor.execute(
+                """
+                SELECT conrelid::regclass::text, conname FROM pg_constraint
+                WHERE contype = 'f' AND confrelid = %s::regclass
+                """,
+                [PARENT_TABLE],
+            )
+            for table, constraint in cursor.fetchall():
+                cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {quote(constraint)}")
+
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [PARENT_TABLE])
+            old_sequence = cursor.fetchone()[0]
+            last_value = 0
+            if old_sequence:
+                cursor.execute(f"SELECT last_value FROM {old_sequence}")
+                last_value = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT setval(%s::regclass, GREATEST(1, %s, (SELECT coalesce(max(id), 0) FROM {new})))",
+                [ID_SEQUENCE, last_value],
+            )
+
+            cursor.execute(f"ALTER TABLE {parent} RENAME TO {old}")
+            for name, _ in indexes:
+                cursor.execute(f"ALTER INDEX {quote(name)} RENAME TO {quote(name[:58] + '_old')}")
+
+            cursor.execute(f"ALTER TABLE {new} RENAME TO {parent}")
+            for name, temp_name in indexes:
+                cursor.execute(f"ALTER INDEX {quote(temp_name)} RENAME TO {quote(name)}")
+
+        partitioning.is_partitioned_cache = None
+        print(f"[*] Replayed the last {replayed} changed row(s) under lock")
+        print("[*] Swapped tables; foreign keys to the earthquake table are now enforced by Django only")
@@ -0,0 +1,129 @@
+import os
+import sys
+import queue
+import signal
+import datetime
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+sys.path.append(os.path.join(settings.BASE_DIR, "scripts"))
+
+import earthquake_pipeline as pipeline
+
+class Command(BaseCommand):
+    help = "Run the acquisition pipeline once, or as a long-running daemon with --loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running, fetching each source on its own interval until SIGTERM")
+        parser.add_argument("--interval-usgs", type=float, default=60, help="Seconds between USGS fetches in loop mode")
+        parser.add_argument("--interval-emsc", type=float, default=60, help="Seconds between EMSC fetches in loop mode")
+        parser.add_argument("--interval-ign", type=float, default=60, help="Seconds between IGN fetches in loop mode")
+        parser.add_argument("--per-event-writes", action="store_true", help="Write events one by one with create_event instead of the batched upsert")
+        parser.add_argument("--threaded-fetch", action="store_true", help="Download feeds with the blocking thread-pool fetchers (one-shot mode only)")
+        parser.add_argument("--full-dedup", action="store_true", help="Rebuild duplicate links over the whole catalog on the first cycle")
+        parser.add_argument("--dedup-engine", choices=sorted(pipeline.DEDUP_ENGINES), default="sql", help="Deduplication engine")
+
+    def handle(self, *args, **options):
+        if not options["loop"]:
+            pipeline.run_cycle(
+                per_event_writes=options["per_event_writes"],
+                threaded_fetch=options["threaded_fetch"],
+                full_dedup=options["full_dedup"],
+                dedup_engine=options["dedup_engine"],
+            )
+            return
+
+        intervals = {
+            "USGS": options["interval_usgs"],
+            "EMSC": options["interval_emsc"],
+            "IGN": options["interval_ign"],
+        }
+
+        self.stop = threading.Event()
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        if pipeline.LOCAL_SPATIAL_INDEX:
+            pipeline.spatial_index.cache.load(pipeline.GEOCODE_CACHE_PATH)
+
+        fetched = queue.Queue(maxsize=4)
+        fetcher = threading.Thread(target=self.fetch_loop, args=(intervals, fetched), name="pipeline-fetcher")
+        fetcher.start()
+        print(f"[✓] Pipeline daemon started (intervals: {', '.join(f'{k}={v:g}s' for k, v in intervals.items())})")
+
+        acquisition = pipeline.AsyncAcquisition()
+        full_dedup = options["full_dedup"]
+        try:
+            while fetcher.is_alive() or not fetched.empty():
+                try:
+                    start, all_events, pending, fetch_stats = fetched.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+                close_old_connections()
+                for key, value in fetch_stats.items():
+                    pipeline.record_stat(key, value)
+                try:
+                    counts = pipeline.store_events(
+                        all_events,
+                        acquisition=acquisition,
+                        per_event_writes=options["per_event_writes"],
+                        full_dedup=full_dedup,
+                        dedup_engine=options["dedup_engine"],
+                        pending=pending,
+                    )
+                    full_dedup = False
+                    pipeline.print_cycle_summary(start, *counts)
+                except Exception as e:
+                    print(f"[!] Pipeline cycle failed: {e}")
+                    pipeline.CYCLE_STATS.clear()
+        finally:
+            self.stop.set()
+            fetcher.join()
+            acquisition.close()
+            pipeline.save_geocode_cache()
+            connection.close()
+            print("[✓] Pipeline daemon stopped")
+
+    def request_stop(self, signum, frame):
+        print(f"[*] Received signal {signum} - finishing current cycle")
+        self.stop.set()
+
+    def fetch_loop(self, intervals, fetched):
+        acquisition = pipeline.AsyncAcquisition()
+        next_due = {source: 0.0 for source in intervals}
+        try:
+            while not self.stop.is_set():
+                now = datetime.datetime.now(datetime.UTC)
+                clock = now.timestamp()
+                due = [source for source, t in next_due.items() if t <= clock]
+                if not due:
+                    self.stop.wait(min(next_due.values()) - clock)
+                    continue
+
+                close_old_connections()
+                pending, fetch_stats = {}, Counter()
+                try:
+                    window = pipeline.init_sync_window()
+                    all_events = acquisition.fetch_events(window, due, pending=pending, stats=fetch_stats)
+                except Exception as e:
+                    print(f"[!] Error fetching {', '.join(due)}: {e}")
+                    all_events = None
+
+                for source in due:
+                    next_due[source] = clock + intervals[source]
+
+                if all_events is not None:
+                    while not self.stop.is_set():
+                        try:
+                            fetched.put((now, all_events, pending, fetch_stats), timeout=1)
+                            break
+                        except queue.Full:
+                            continue
+        finally:
+            acquisition.close()
+            connection.close()
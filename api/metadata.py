@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Min
+
+from .caching import get_catalog_version, get_version_token
+from .models import Earthquake, FilterValue
+
+METADATA_FIELDS = {
+    "sources": "source",
+    "tectonic_plates": "tectonic_plate",
+    "origin_countries": "origin_country",
+    "mag_types": "mag_type",
+}
+
+SOURCE_CHOICES_KEY = "filter_metadata:sources"
+
+known_values = None
+
+def load_known_values():
+    global known_values
+    if known_values is None:
+        known_values = set(FilterValue.objects.values_list("field", "value"))
+    return known_values
+
+def register_filter_values(events):
+    known = load_known_values()
+    new = set()
+    for event in events:
+        for field in METADATA_FIELDS.values():
+            value = event.get(field)
+            if value and (field, value) not in known:
+                new.add((field, value))
+
+    if new:
+        FilterValue.objects.bulk_create([FilterValue(field=f, value=v) for f, v in new], ignore_conflicts=True)
+        known.update(new)
+        cache.delete(SOURCE_CHOICES_KEY)
+    return len(new)
+
+def rebuild_filter_values():
+    global known_values
+    rows = set()
+    for field in METADATA_FIELDS.values():
+        values = Earthquake.objects.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""}).values_list(field, flat=True).distinct()
+        rows.update((field, value) for value in values)
+
+    FilterValue.objects.all().delete()
+    FilterValue.objects.bulk_create([FilterValue(field=f, value=v) for f, v in rows])
+    known_values = rows
+    cache.delete(SOURCE_CHOICES_KEY)
+    return len(rows)
+
+def build_filter_metadata():
+    grouped = {name: [] for name in METADATA_FIELDS}
+    names = {field: name for name, field in METADATA_FIELDS.items()}
+    for field, value in FilterValue.objects.order_by("field", "value").values_list("field", "value"):
+        if field in names:
+            grouped[names[field]].append(value)
+
+    ranges = Earthquake.objects.aggregate(
+        min_origin_time=Min("origin_time"), max_origin_time=Max("origin_time"),
+        min_magnitude=Min("magnitude"), max_magnitude=Max("magnitude"),
+    )
+    return {**grouped, **ranges}
+
+def get_filter_metadata():
+    key = f"filter_metadata:{get_version_token(get_catalog_version())}"
+    metadata = cache.get(key)
+    if metadata is None:
+        metadata = build_filter_metadata()
+        cache.set(key, metadata, settings.API_CACHE_TIMEOUT)
+    return metadata
+
+def get_source_choices():
+    sources = cache.get(SOURCE_CHOICES_KEY)
+    if sources is None:
+        sources = list(FilterValue.objects.filter(field=METADATA_FIELDS["sources"]).order_by("value").values_list("value", flat=True))
+        cache.set(SOURCE_CHOICES_KEY, sources, settings.API_CACHE_TIMEOUT)
+    return [(s, s) for s in sources]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_rename_terremotos__origin__bc8efd_idx_api_earthqu_origin__3d963c_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncstate',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the last successfully processed feed payload', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='syncstate',
+            name='etag',
+            field=models.CharField(blank=True, help_text='ETag returned by the source feed on the last successful download', max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='syncstate',
+            name='last_modified',
+            field=models.CharField(blank=True, help_text='Last-Modified header returned by the source feed on the last successful download', max_length=64, null=True),
+        ),
+    ]
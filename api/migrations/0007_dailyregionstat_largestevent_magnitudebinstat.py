@@ -0,0 +1,64 @@
+# Generated by Django 5.1.4 on 2026-10-17 18:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_syncstate_content_hash_syncstate_etag_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRegionStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='UTC calendar day of the event origin times')),
+                ('region_type', models.CharField(help_text="Grouping dimension: 'plate' or 'country'", max_length=16)),
+                ('region', models.CharField(blank=True, help_text='Tectonic plate or origin country name (null when unknown)', max_length=255, null=True)),
+                ('event_count', models.IntegerField(help_text='Number of canonical (non-duplicate) events')),
+                ('max_magnitude', models.FloatField(blank=True, help_text='Largest magnitude reported for the bucket', null=True)),
+                ('magnitude_sum', models.FloatField(default=0, help_text='Sum of magnitudes, used to derive means over arbitrary day ranges')),
+                ('magnitude_count', models.IntegerField(default=0, help_text='Number of events with a magnitude value')),
+            ],
+            options={
+                'verbose_name': 'Daily region statistic',
+                'verbose_name_plural': 'Daily region statistics',
+                'db_table': 'stats_daily_region',
+                'indexes': [models.Index(fields=['region_type', 'day'], name='stats_daily_region__c19c4e_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MagnitudeBinStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='UTC calendar day of the event origin times')),
+                ('magnitude_bin', models.IntegerField(help_text='Magnitude bin in tenths of a unit (floor(M * 10))')),
+                ('event_count', models.IntegerField(help_text='Number of canonical events in the bin')),
+            ],
+            options={
+                'verbose_name': 'Magnitude bin statistic',
+                'verbose_name_plural': 'Magnitude bin statistics',
+                'db_table': 'stats_magnitude_bin',
+                'indexes': [models.Index(fields=['day'], name='stats_magni_day_aeb15e_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LargestEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(help_text='Trailing time window (24h, 7d or 30d)', max_length=8)),
+                ('rank', models.IntegerField(help_text='Position within the window, 1 being the largest magnitude')),
+                ('earthquake', models.ForeignKey(help_text='Ranked canonical event', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.earthquake')),
+            ],
+            options={
+                'verbose_name': 'Largest event',
+                'verbose_name_plural': 'Largest events',
+                'db_table': 'stats_largest_event',
+                'ordering': ['window', 'rank'],
+                'indexes': [models.Index(fields=['window', 'rank'], name='stats_large_window_02b36e_idx')],
+            },
+        ),
+    ]
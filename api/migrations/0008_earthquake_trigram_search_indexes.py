@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:05
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_dailyregionstat_largestevent_magnitudebinstat'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=models.Index(fields=['source_id'], name='api_earthqu_source__dc2e6d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('place_name'), name='gin_trgm_ops'), name='api_eq_place_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('source_id'), name='gin_trgm_ops'), name='api_eq_source_id_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('origin_country'), name='gin_trgm_ops'), name='api_eq_origin_country_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('tectonic_plate'), name='gin_trgm_ops'), name='api_eq_tectonic_plate_trgm'),
+        ),
+    ]
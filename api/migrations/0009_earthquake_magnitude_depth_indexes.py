@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-17 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_earthquake_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=models.Index(fields=['magnitude', 'origin_time'], name='api_earthqu_magnitu_15227e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=models.Index(fields=['depth_km'], name='api_earthqu_depth_k_08ecb7_idx'),
+        ),
+    ]
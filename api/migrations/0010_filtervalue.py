@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:30
+
+from django.db import migrations, models
+
+
+FIELDS = ["source", "tectonic_plate", "origin_country", "mag_type"]
+
+
+def populate_filter_values(apps, schema_editor):
+    Earthquake = apps.get_model("api", "Earthquake")
+    FilterValue = apps.get_model("api", "FilterValue")
+    rows = []
+    for field in FIELDS:
+        values = Earthquake.objects.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""}).values_list(field, flat=True).distinct()
+        rows.extend(FilterValue(field=field, value=value) for value in values)
+    FilterValue.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_earthquake_magnitude_depth_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilterValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(help_text='Earthquake field the value belongs to (source, tectonic_plate, origin_country, mag_type)', max_length=32)),
+                ('value', models.CharField(help_text='Distinct value observed in the catalog for that field', max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Filter value',
+                'verbose_name_plural': 'Filter values',
+                'db_table': 'filter_values',
+                'constraints': [models.UniqueConstraint(fields=('field', 'value'), name='unique_filter_value')],
+            },
+        ),
+        migrations.RunPython(populate_filter_values, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 21:10
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_filtervalue'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=django.contrib.postgres.indexes.BrinIndex(autosummarize=True, fields=['origin_time'], name='api_eq_origin_time_brin'),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.1.4 on 2026-10-17 22:00
+
+import json
+import zlib
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+
+def move_raw_data(apps, schema_editor):
+    Earthquake = apps.get_model("api", "Earthquake")
+    RawPayload = apps.get_model("api", "RawPayload")
+    RawDataVersion = apps.get_model("api", "RawDataVersion")
+
+    last_id = 0
+    while True:
+        rows = list(
+            Earthquake.objects.filter(id__gt=last_id).order_by("id")
+            .values_list("id", "global_id", "raw_data", "updated_time", "retrieved_time")[:5000]
+        )
+        if not rows:
+            break
+
+        with transaction.atomic(using=schema_editor.connection.alias):
+            encoded = {}
+            for pk, global_id, raw_data, updated_time, retrieved_time in rows:
+                raw = json.dumps(raw_data or {}, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+                encoded[pk] = (global_id, hashlib.sha256(raw).hexdigest(), raw, updated_time, retrieved_time)
+
+            blobs = {h: raw for _, h, raw, _, _ in encoded.values()}
+            RawPayload.objects.bulk_create(
+                [RawPayload(content_hash=h, data=zlib.compress(raw, 6), size=len(raw)) for h, raw in blobs.items()],
+                ignore_conflicts=True,
+            )
+            payload_ids = dict(RawPayload.objects.filter(content_hash__in=blobs).values_list("content_hash", "id"))
+
+            RawDataVersion.objects.bulk_create([
+                RawDataVersion(global_id=global_id, version=1, payload_id=payload_ids[h], updated_time=updated_time, retrieved_time=retrieved_time)
+                for global_id, h, _, updated_time, retrieved_time in encoded.values() if global_id
+            ], ignore_conflicts=True)
+
+            objs = [Earthquake(id=pk, raw_payload_id=payload_ids[h]) for pk, (_, h, _, _, _) in encoded.items()]
+            Earthquake.objects.bulk_update(objs, ["raw_payload"], batch_size=1000)
+
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0011_earthquake_origin_time_brin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RawPayload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(help_text='SHA-256 of the stored JSON payload', max_length=64, unique=True)),
+                ('data', models.BinaryField(help_text='zlib-compressed JSON of the original source record, in its original key order')),
+                ('size', models.IntegerField(help_text='Uncompressed payload size in bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='UTC timestamp when the payload was first stored')),
+            ],
+            options={
+                'verbose_name': 'Raw payload',
+                'verbose_name_plural': 'Raw payloads',
+                'db_table': 'raw_payloads',
+            },
+        ),
+        migrations.CreateModel(
+            name='RawDataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('global_id', models.CharField(help_text='Persistent global identifier of the event', max_length=255)),
+                ('version', models.IntegerField(help_text='Revision number of the source record, starting at 1')),
+                ('updated_time', models.DateTimeField(blank=True, help_text='Source update timestamp of this revision (UTC)', null=True)),
+                ('retrieved_time', models.DateTimeField(blank=True, help_text='Timestamp when this revision was retrieved (UTC)', null=True)),
+                ('payload', models.ForeignKey(help_text='Stored payload for this revision', on_delete=django.db.models.deletion.PROTECT, related_name='versions', to='api.rawpayload')),
+            ],
+            options={
+                'verbose_name': 'Raw data version',
+                'verbose_name_plural': 'Raw data versions',
+                'db_table': 'raw_data_versions',
+                'constraints': [models.UniqueConstraint(fields=('global_id', 'version'), name='unique_raw_data_version')],
+            },
+        ),
+        migrations.AddField(
+            model_name='earthquake',
+            name='raw_payload',
+            field=models.ForeignKey(blank=True, help_text='Reference to the compressed original JSON record from the source feed, kept in the provenance store', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.rawpayload'),
+        ),
+        migrations.RunPython(move_raw_data, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='earthquake',
+            name='raw_data',
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.4 on 2026-10-17 22:45
+
+import json
+import hashlib
+
+from django.db import migrations, models, transaction
+
+
+def fingerprint(row):
+    origin_time, latitude, longitude, depth_km, magnitude, mag_type, place_name, tsunami, has_curves = row
+
+    def rounded(value, digits):
+        return None if value is None else round(value, digits)
+
+    depth = rounded(depth_km, 2)
+    values = [
+        origin_time.isoformat() if origin_time else None,
+        rounded(latitude, 4),
+        rounded(longitude, 4),
+        abs(depth) if depth is not None else None,
+        rounded(magnitude, 2),
+        mag_type or None,
+        place_name or None,
+        tsunami,
+        has_curves,
+    ]
+    return hashlib.sha256(json.dumps(values, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def populate_fingerprints(apps, schema_editor):
+    Earthquake = apps.get_model("api", "Earthquake")
+    columns = ["origin_time", "latitude", "longitude", "depth_km", "magnitude", "mag_type", "place_name", "tsunami", "has_curves"]
+
+    last_id = 0
+    while True:
+        rows = list(Earthquake.objects.filter(id__gt=last_id).order_by("id").values_list("id", *columns)[:5000])
+        if not rows:
+            break
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Earthquake.objects.bulk_update(
+                [Earthquake(id=row[0], content_fingerprint=fingerprint(row[1:])) for row in rows],
+                ["content_fingerprint"], batch_size=1000,
+            )
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('api', '0012_rawpayload_rawdataversion_earthquake_raw_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='earthquake',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, help_text='SHA-256 of the normalized origin time, location, depth, magnitude, place and flags, used to detect real revisions', max_length=64, null=True),
+        ),
+        migrations.RunPython(populate_fingerprints, migrations.RunPython.noop),
+    ]
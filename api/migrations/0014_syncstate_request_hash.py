@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_earthquake_content_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='syncstate',
+            name='request_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the feed URL and query parameters the stored ETag and Last-Modified belong to', max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:02
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_syncstate_request_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='earthquake',
+            index=django.contrib.postgres.indexes.GistIndex(django.db.models.functions.comparison.Cast('location', output_field=django.contrib.gis.db.models.fields.GeometryField(srid=4326)), name='api_eq_location_geom_gist'),
+        ),
+    ]
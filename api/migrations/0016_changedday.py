@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+POPULATE_SQL = """
+INSERT INTO catalog_changed_day (day, changed_at)
+SELECT (origin_time AT TIME ZONE 'UTC')::date, max(retrieved_time)
+FROM api_earthquake
+WHERE retrieved_time IS NOT NULL
+GROUP BY 1
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_earthquake_location_geometry_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangedDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='UTC calendar day whose events were written, moved away or relinked as duplicates', unique=True)),
+                ('changed_at', models.DateTimeField(db_index=True, help_text='UTC timestamp of the latest change recorded for the day')),
+            ],
+            options={
+                'verbose_name': 'Changed day',
+                'verbose_name_plural': 'Changed days',
+                'db_table': 'catalog_changed_day',
+            },
+        ),
+        migrations.RunSQL(POPULATE_SQL, migrations.RunSQL.noop),
+    ]
@@ -1,6 +1,11 @@
+import json
+import zlib
+
 from django.db import models
 from django.contrib.gis.db import models as gis_models
 from django.contrib.gis.geos import Point
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, GistIndex, OpClass
+from django.db.models.functions import Cast, Upper
 
 class Earthquake(models.Model):
     id = models.AutoField(primary_key=True, help_text="Internal database identifier")
@@ -28,8 +33,13 @@ class Earthquake(models.Model):
 
     updated_time = models.DateTimeField(null=True, blank=True, help_text="Timestamp of the last update received from the source feed (UTC)")
     retrieved_time = models.DateTimeField(null=True, blank=True, help_text="Timestamp when the event was retrieved by the local acquisition system (UTC)")
+    content_fingerprint = models.CharField(max_length=64, null=True, blank=True, help_text="SHA-256 of the normalized origin time, location, depth, magnitude, place and flags, used to detect real revisions")
 
-    raw_data = models.JSONField(null=True, blank=True, default=dict, help_text="Original raw JSON record from the source feed for reproducibility and provenance tracking")
+    raw_payload = models.ForeignKey(
+        "RawPayload", on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="+",
+        help_text="Reference to the compressed original JSON record from the source feed, kept in the provenance store"
+    )
 
     duplicate_of = models.ForeignKey(
         "self", on_delete=models.SET_NULL, null=True, blank=True,
@@ -47,8 +57,21 @@ class Earthquake(models.Model):
             models.Index(fields=["origin_time"]),
             models.Index(fields=["retrieved_time"]),
             models.Index(fields=["source"]),
+            models.Index(fields=["source_id"]),
+            models.Index(fields=["magnitude", "origin_time"]),
+            models.Index(fields=["depth_km"]),
+            BrinIndex(fields=["origin_time"], name="api_eq_origin_time_brin", autosummarize=True),
+            GistIndex(Cast("location", output_field=gis_models.GeometryField(srid=4326)), name="api_eq_location_geom_gist"),
+            GinIndex(OpClass(Upper("place_name"), name="gin_trgm_ops"), name="api_eq_place_name_trgm"),
+            GinIndex(OpClass(Upper("source_id"), name="gin_trgm_ops"), name="api_eq_source_id_trgm"),
+            GinIndex(OpClass(Upper("origin_country"), name="gin_trgm_ops"), name="api_eq_origin_country_trgm"),
+            GinIndex(OpClass(Upper("tectonic_plate"), name="gin_trgm_ops"), name="api_eq_tectonic_plate_trgm"),
         ]
 
+    @property
+    def raw_data(self):
+        return self.raw_payload.load() if self.raw_payload_id else None
+
     def save(self, *args, **kwargs):
         if self.latitude is not None and self.longitude is not None:
             try:
@@ -122,6 +145,11 @@ class SyncState(models.Model):
     last_sync_end = models.DateTimeField(null=True, blank=True, help_text="UTC timestamp marking the end of the last synchronization window")
     last_run_at = models.DateTimeField(null=True, blank=True, help_text="UTC timestamp of the most recent synchronization process")
 
+    etag = models.CharField(max_length=255, null=True, blank=True, help_text="ETag returned by the source feed on the last successful download")
+    last_modified = models.CharField(max_length=64, null=True, blank=True, help_text="Last-Modified header returned by the source feed on the last successful download")
+    content_hash = models.CharField(max_length=64, null=True, blank=True, help_text="SHA-256 of the last successfully processed feed payload")
+    request_hash = models.CharField(max_length=64, null=True, blank=True, help_text="SHA-256 of the feed URL and query parameters the stored ETag and Last-Modified belong to")
+
     class Meta:
         db_table = "sync_state"
         verbose_name = "Synchronization state"
@@ -131,4 +159,117 @@ class SyncState(models.Model):
     def __str__(self):
         status = "done" if self.value else "pending"
         run_time = self.last_run_at.strftime('%Y-%m-%d %H:%M:%S') if self.last_run_at else "never"
-        return f"{self.key}: {status} (last run: {run_time})"
\ No newline at end of file
+        return f"{self.key}: {status} (last run: {run_time})"
+
+class DailyRegionStat(models.Model):
+    day = models.DateField(help_text="UTC calendar day of the event origin times")
+    region_type = models.CharField(max_length=16, help_text="Grouping dimension: 'plate' or 'country'")
+    region = models.CharField(max_length=255, null=True, blank=True, help_text="Tectonic plate or origin country name (null when unknown)")
+    event_count = models.IntegerField(help_text="Number of canonical (non-duplicate) events")
+    max_magnitude = models.FloatField(null=True, blank=True, help_text="Largest magnitude reported for the bucket")
+    magnitude_sum = models.FloatField(default=0, help_text="Sum of magnitudes, used to derive means over arbitrary day ranges")
+    magnitude_count = models.IntegerField(default=0, help_text="Number of events with a magnitude value")
+
+    class Meta:
+        db_table = "stats_daily_region"
+        verbose_name = "Daily region statistic"
+        verbose_name_plural = "Daily region statistics"
+        indexes = [models.Index(fields=["region_type", "day"])]
+
+    def __str__(self):
+        return f"{self.day} | {self.region_type}={self.region or '–'} | {self.event_count} events"
+
+class MagnitudeBinStat(models.Model):
+    day = models.DateField(help_text="UTC calendar day of the event origin times")
+    magnitude_bin = models.IntegerField(help_text="Magnitude bin in tenths of a unit (floor(M * 10))")
+    event_count = models.IntegerField(help_text="Number of canonical events in the bin")
+
+    class Meta:
+        db_table = "stats_magnitude_bin"
+        verbose_name = "Magnitude bin statistic"
+        verbose_name_plural = "Magnitude bin statistics"
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self):
+        return f"{self.day} | M{self.magnitude_bin / 10:.1f} | {self.event_count} events"
+
+class LargestEvent(models.Model):
+    window = models.CharField(max_length=8, help_text="Trailing time window (24h, 7d or 30d)")
+    rank = models.IntegerField(help_text="Position within the window, 1 being the largest magnitude")
+    earthquake = models.ForeignKey(Earthquake, on_delete=models.CASCADE, related_name="+", help_text="Ranked canonical event")
+
+    class Meta:
+        db_table = "stats_largest_event"
+        verbose_name = "Largest event"
+        verbose_name_plural = "Largest events"
+        ordering = ["window", "rank"]
+        indexes = [models.Index(fields=["window", "rank"])]
+
+    def __str__(self):
+        return f"{self.window} #{self.rank}: {self.earthquake}"
+
+class ChangedDay(models.Model):
+    day = models.DateField(unique=True, help_text="UTC calendar day whose events were written, moved away or relinked as duplicates")
+    changed_at = models.DateTimeField(db_index=True, help_text="UTC timestamp of the latest change recorded for the day")
+
+    class Meta:
+        db_table = "catalog_changed_day"
+        verbose_name = "Changed day"
+        verbose_name_plural = "Changed days"
+
+    def __str__(self):
+        return f"{self.day} (changed {self.changed_at:%Y-%m-%d %H:%M:%S})"
+
+class FilterValue(models.Model):
+    field = models.CharField(max_length=32, help_text="Earthquake field the value belongs to (source, tectonic_plate, origin_country, mag_type)")
+    value = models.CharField(max_length=255, help_text="Distinct value observed in the catalog for that field")
+
+    class Meta:
+        db_table = "filter_values"
+        verbose_name = "Filter value"
+        verbose_name_plural = "Filter values"
+        constraints = [
+            models.UniqueConstraint(fields=["field", "value"], name="unique_filter_value")
+        ]
+
+    def __str__(self):
+        return f"{self.field}={self.value}"
+
+class RawPayload(models.Model):
+    content_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the stored JSON payload")
+    data = models.BinaryField(help_text="zlib-compressed JSON of the original source record, in its original key order")
+    size = models.IntegerField(help_text="Uncompressed payload size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="UTC timestamp when the payload was first stored")
+
+    class Meta:
+        db_table = "raw_payloads"
+        verbose_name = "Raw payload"
+        verbose_name_plural = "Raw payloads"
+
+    @staticmethod
+    def decode(blob):
+        return None if blob is None else zlib.decompress(bytes(blob)).decode("utf-8")
+
+    def load(self):
+        return json.loads(self.decode(self.data))
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.size} bytes)"
+
+class RawDataVersion(models.Model):
+    global_id = models.CharField(max_length=255, help_text="Persistent global identifier of the event")
+    version = models.IntegerField(help_text="Revision number of the source record, starting at 1")
+    payload = models.ForeignKey(RawPayload, on_delete=models.PROTECT, related_name="versions", help_text="Stored payload for this revision")
+    updated_time = models.DateTimeField(null=True, blank=True, help_text="Source update timestamp of this revision (UTC)")
+    retrieved_time = models.DateTimeField(null=True, blank=True, help_text="Timestamp when this revision was retrieved (UTC)")
+
+    class Meta:
+        db_table = "raw_data_versions"
+        verbose_name = "Raw data version"
+        verbose_name_plural = "Raw data versions"
+        constraints = [
+            models.UniqueConstraint(fields=["global_id", "version"], name="unique_raw_data_version")
+        ]
+
+    def __str__(self):
+        return f"{self.global_id[:12]} v{self.version}"
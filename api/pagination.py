@@ -0,0 +1,138 @@
+import json
+import base64
+import datetime
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class EarthquakePageNumberPagination(PageNumberPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+class KeysetPagination(BasePagination):
+    page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 10)
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    time_field = "origin_time"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_descending(self, request):
+        ordering = request.query_params.get("ordering", f"-{self.time_field}")
+        if ordering not in (self.time_field, f"-{self.time_field}"):
+            raise ValidationError({"ordering": f"Cursor pagination only supports ordering by {self.time_field} or -{self.time_field}."})
+        return ordering.startswith("-")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            direction, time_value, pk = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii").split("|")
+            if direction not in ("n", "p"):
+                raise ValueError(direction)
+            return direction, datetime.datetime.fromisoformat(time_value), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, direction, obj):
+        value = f"{direction}|{getattr(obj, self.time_field).isoformat()}|{obj.pk}"
+        encoded = base64.urlsafe_b64encode(value.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        descending = self.get_descending(request)
+        cursor = self.decode_cursor(request)
+
+        self.estimated_count = None
+        if request.query_params.get(self.count_query_param) == "estimate":
+            self.estimated_count = self.estimate_count(queryset)
+
+        direction = cursor[0] if cursor else "n"
+        forward = descending if direction == "n" else not descending
+        prefix = "-" if forward else ""
+        queryset = queryset.order_by(f"{prefix}{self.time_field}", f"{prefix}pk")
+
+        if cursor:
+            _, time_value, pk = cursor
+            lookup = "lt" if forward else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.time_field}__{lookup}": time_value})
+                | Q(**{self.time_field: time_value, f"pk__{lookup}": pk})
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if direction == "p":
+            rows.reverse()
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = rows
+        return rows
+
+    def estimate_count(self, queryset):
+        try:
+            plan = json.loads(queryset.order_by().explain(format="json"))
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception:
+            return None
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor("n", self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor("p", self.page[0])
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+        ])
+        if self.estimated_count is not None:
+            response["estimated_count"] = self.estimated_count
+        response["results"] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "estimated_count": {"type": "integer", "nullable": True},
+                "results": schema,
+            },
+        }
+
+def use_keyset_pagination(request):
+    params = request.query_params
+    return params.get("pagination") == "cursor" or KeysetPagination.cursor_query_param in params
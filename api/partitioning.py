@@ -0,0 +1,121 @@
+import datetime
+
+from django.db import connection
+
+from .models import Earthquake
+
+PARENT_TABLE = Earthquake._meta.db_table
+GLOBAL_ID_TABLE = f"{PARENT_TABLE}_global_ids"
+GLOBAL_ID_TRIGGER = f"{PARENT_TABLE}_global_id_sync"
+MONTHS_AHEAD = 3
+
+GLOBAL_ID_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM {registry} WHERE global_id = OLD.global_id AND earthquake_id = OLD.id;
+        RETURN OLD;
+    END IF;
+    INSERT INTO {registry} (global_id, earthquake_id) VALUES (NEW.global_id, NEW.id)
+    ON CONFLICT (global_id) DO NOTHING;
+    IF NOT EXISTS (SELECT 1 FROM {registry} WHERE global_id = NEW.global_id AND earthquake_id = NEW.id) THEN
+        RAISE unique_violation USING MESSAGE = format('duplicate global_id %s', NEW.global_id);
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+RESERVE_GLOBAL_IDS_SQL = """
+INSERT INTO {registry} (global_id, earthquake_id)
+SELECT g, nextval(pg_get_serial_sequence(%s, 'id'))
+FROM unnest(%s::varchar[]) AS g
+WHERE NOT EXISTS (SELECT 1 FROM {registry} r WHERE r.global_id = g)
+ON CONFLICT (global_id) DO NOTHING
+RETURNING global_id, earthquake_id
+"""
+
+is_partitioned_cache = None
+
+def quote(name):
+    return connection.ops.quote_name(name)
+
+def is_partitioned(refresh=False):
+    global is_partitioned_cache
+    if refresh or is_partitioned_cache is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_partitioned_table pt
+                    JOIN pg_class c ON c.oid = pt.partrelid
+                    WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace
+                )
+                """,
+                [PARENT_TABLE],
+            )
+            is_partitioned_cache = cursor.fetchone()[0]
+    return is_partitioned_cache
+
+def month_start(value):
+    return datetime.datetime(value.year, value.month, 1, tzinfo=datetime.UTC)
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month):
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+def iter_months(first, last):
+    month = month_start(first)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+def existing_partitions(parent=PARENT_TABLE):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [parent],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+def create_partitions(first, last, parent=PARENT_TABLE):
+    existing = existing_partitions(parent)
+    created = []
+    with connection.cursor() as cursor:
+        for month in iter_months(first, last):
+            name = partition_name(month)
+            if name in existing:
+                continue
+            cursor.execute(
+                f"CREATE TABLE {quote(name)} PARTITION OF {quote(parent)} FOR VALUES FROM (%s) TO (%s)",
+                [month, add_months(month, 1)],
+            )
+            created.append(name)
+    return created
+
+def reserve_global_ids(global_ids):
+    global_ids = list(dict.fromkeys(global_ids))
+    registry = quote(GLOBAL_ID_TABLE)
+    with connection.cursor() as cursor:
+        cursor.execute(RESERVE_GLOBAL_IDS_SQL.format(registry=registry), [PARENT_TABLE, global_ids])
+        reserved = {global_id: (pk, True) for global_id, pk in cursor.fetchall()}
+
+        missing = [global_id for global_id in global_ids if global_id not in reserved]
+        if missing:
+            cursor.execute(f"SELECT global_id, earthquake_id FROM {registry} WHERE global_id = ANY(%s)", [missing])
+            reserved.update((global_id, (pk, False)) for global_id, pk in cursor.fetchall())
+    return reserved
+
+def ensure_future_partitions(months_ahead=MONTHS_AHEAD):
+    if not is_partitioned(refresh=True):
+        return []
+    now = datetime.datetime.now(datetime.UTC)
+    return create_partitions(month_start(now), add_months(month_start(now), months_ahead))
@@ -0,0 +1,68 @@
+import json
+import zlib
+import hashlib
+
+from django.db import DatabaseError, connection
+
+from .models import RawDataVersion, RawPayload
+
+COMPRESSION_LEVEL = 6
+VERSION_ATTEMPTS = 5
+
+INSERT_VERSIONS_SQL = """
+WITH revisions AS (
+    SELECT n.global_id, n.payload_id, n.updated_time, n.retrieved_time, COALESCE(latest.version, 0) + 1 AS version
+    FROM unnest(%s::varchar[], %s::bigint[], %s::timestamptz[], %s::timestamptz[])
+        AS n(global_id, payload_id, updated_time, retrieved_time)
+    LEFT JOIN LATERAL (
+        SELECT v.version, v.payload_id FROM {versions} v
+        WHERE v.global_id = n.global_id
+        ORDER BY v.version DESC
+        LIMIT 1
+    ) latest ON true
+    WHERE latest.payload_id IS DISTINCT FROM n.payload_id
+),
+inserted AS (
+    INSERT INTO {versions} (global_id, version, payload_id, updated_time, retrieved_time)
+    SELECT global_id, version, payload_id, updated_time, retrieved_time FROM revisions
+    ON CONFLICT (global_id, version) DO NOTHING
+    RETURNING global_id
+)
+SELECT r.global_id FROM revisions r
+WHERE NOT EXISTS (SELECT 1 FROM inserted i WHERE i.global_id = r.global_id)
+"""
+
+def encode_payload(data):
+    raw = json.dumps(data or {}, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest(), zlib.compress(raw, COMPRESSION_LEVEL), len(raw)
+
+def insert_versions(revisions):
+    sql = INSERT_VERSIONS_SQL.format(versions=connection.ops.quote_name(RawDataVersion._meta.db_table))
+    with connection.cursor() as cursor:
+        for _ in range(VERSION_ATTEMPTS):
+            if not revisions:
+                return
+            cursor.execute(sql, [list(column) for column in zip(*revisions)])
+            conflicted = {row[0] for row in cursor.fetchall()}
+            revisions = [r for r in revisions if r[0] in conflicted]
+    if revisions:
+        raise DatabaseError(f"Could not allocate raw data versions for {len(revisions)} event(s) after {VERSION_ATTEMPTS} attempts")
+
+def store_payloads(events):
+    encoded = {event["global_id"]: (event, *encode_payload(event.get("raw_data"))) for event in events}
+    if not encoded:
+        return {}
+
+    blobs = {content_hash: (blob, size) for _, content_hash, blob, size in encoded.values()}
+    RawPayload.objects.bulk_create(
+        [RawPayload(content_hash=h, data=blob, size=size) for h, (blob, size) in blobs.items()],
+        ignore_conflicts=True,
+    )
+    payload_ids = dict(RawPayload.objects.filter(content_hash__in=blobs).values_list("content_hash", "id"))
+
+    insert_versions([
+        (global_id, payload_ids[content_hash], event.get("updated_time_utc"), event.get("retrieved_time_utc"))
+        for global_id, (event, content_hash, _, _) in encoded.items()
+    ])
+
+    return {global_id: payload_ids[content_hash] for global_id, (_, content_hash, _, _) in encoded.items()}
@@ -0,0 +1,54 @@
+import operator
+from functools import reduce
+
+from django.contrib.gis.db.models.functions import GeometryDistance
+from django.contrib.gis.geos import Point
+from django.db.models import BooleanField, Case, Q, Value, When
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+MAX_NEAREST = 1000
+
+def parse_point(value):
+    try:
+        lon, lat = (float(v) for v in (value or "").split(","))
+    except ValueError:
+        raise ValidationError({"near": "Expected 'lon,lat' in decimal degrees."})
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        raise ValidationError({"near": "Coordinates out of range."})
+    return Point(lon, lat, srid=4326)
+
+class CatalogSearchFilter(filters.SearchFilter):
+    exact_fields = ["global_id", "source_id"]
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or len(search_terms) != 1:
+            return super().filter_queryset(request, queryset, view)
+
+        term = search_terms[0]
+        exact = reduce(operator.or_, (Q(**{f: term}) for f in self.exact_fields))
+        contains = reduce(operator.or_, (Q(**{self.construct_search(str(f), queryset): term}) for f in search_fields))
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return (
+            queryset.filter(exact | contains)
+            .annotate(exact_match=Case(When(exact, then=Value(True)), default=Value(False), output_field=BooleanField()))
+            .order_by("-exact_match", *ordering)
+        )
+
+class NearestFilter(filters.BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get("nearest")
+        if not value:
+            return queryset
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError({"nearest": "Must be an integer."})
+        if not 1 <= limit <= MAX_NEAREST:
+            raise ValidationError({"nearest": f"Must be between 1 and {MAX_NEAREST}."})
+
+        distance = GeometryDistance("location", parse_point(request.query_params.get("near")))
+        nearest_ids = queryset.order_by(distance).values("id")[:limit]
+        return queryset.filter(id__in=nearest_ids).order_by(distance)
@@ -2,8 +2,35 @@ from rest_framework_gis.serializers import GeoFeatureModelSerializer
 from rest_framework import serializers
 from .models import Earthquake
 
-class EarthquakeSerializer(GeoFeatureModelSerializer):
+INTERNAL_FIELDS = ["content_fingerprint"]
+EARTHQUAKE_FIELDS = [
+    "raw_data" if field.name == "raw_payload" else field.name
+    for field in Earthquake._meta.concrete_fields if field.name not in INTERNAL_FIELDS
+]
+LIST_FIELDS = [name for name in EARTHQUAKE_FIELDS if name != "raw_data"]
+REQUIRED_FIELDS = ["id", "location"]
+
+class DynamicFieldsMixin:
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            keep = set(fields) | set(REQUIRED_FIELDS)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
+
+class EarthquakeSerializer(DynamicFieldsMixin, GeoFeatureModelSerializer):
+    raw_data = serializers.JSONField(read_only=True)
+
+    class Meta:
+        model = Earthquake
+        geo_field = "location"
+        fields = EARTHQUAKE_FIELDS
+
+class EarthquakeListSerializer(DynamicFieldsMixin, GeoFeatureModelSerializer):
     class Meta:
         model = Earthquake
         geo_field = "location"
-        fields = "__all__"
+        fields = LIST_FIELDS
@@ -0,0 +1,176 @@
+import os
+import json
+import math
+import threading
+from collections import OrderedDict
+
+from django.contrib.gis.geos import GEOSGeometry, Point, Polygon
+
+from .models import Country, Plate
+
+class SpatialIndex:
+    def __init__(self, records, cell_size=1.0):
+        self.cell_size = cell_size
+        self.labels = []
+        self.geometries = []
+        self.cells = {}
+
+        for label, wkb in records:
+            geom = GEOSGeometry(wkb)
+            idx = len(self.geometries)
+            self.labels.append(label)
+            self.geometries.append(geom.prepared)
+
+            xmin, ymin, xmax, ymax = geom.extent
+            for cx in range(self._cell(xmin), self._cell(xmax) + 1):
+                for cy in range(self._cell(ymin), self._cell(ymax) + 1):
+                    self.cells.setdefault((cx, cy), []).append(idx)
+
+    def _cell(self, value):
+        return math.floor(value / self.cell_size)
+
+    def candidates(self, lon, lat):
+        return self.cells.get((self._cell(lon), self._cell(lat)), [])
+
+    def candidates_in_box(self, xmin, ymin, xmax, ymax):
+        found = set()
+        for cx in range(self._cell(xmin), self._cell(xmax) + 1):
+            for cy in range(self._cell(ymin), self._cell(ymax) + 1):
+                found.update(self.cells.get((cx, cy), []))
+        return sorted(found)
+
+    def classify_box(self, xmin, ymin, xmax, ymax):
+        box = Polygon.from_bbox((xmin, ymin, xmax, ymax))
+        box.srid = 4326
+        for idx in self.candidates_in_box(xmin, ymin, xmax, ymax):
+            if self.geometries[idx].intersects(box):
+                if self.geometries[idx].contains(box):
+                    return False, self.labels[idx]
+                return True, None
+        return False, None
+
+    def lookup(self, lon, lat):
+        point = Point(lon, lat, srid=4326)
+        for idx in self.candidates(lon, lat):
+            if self.geometries[idx].intersects(point):
+                return self.labels[idx]
+        return None
+
+_records = {}
+_records_lock = threading.Lock()
+_local = threading.local()
+
+def load_records(name):
+    with _records_lock:
+        if name not in _records:
+            if name == "plates":
+                rows = Plate.objects.order_by("pk").values_list("platename", "code", "geom")
+            else:
+                rows = Country.objects.order_by("pk").values_list("admin", "sovereignt", "geom")
+            _records[name] = [(primary or fallback or None, bytes(geom.wkb)) for primary, fallback, geom in rows]
+        return _records[name]
+
+def get_index(name):
+    indexes = getattr(_local, "indexes", None)
+    if indexes is None:
+        indexes = _local.indexes = {}
+    if name not in indexes:
+        indexes[name] = SpatialIndex(load_records(name))
+    return indexes[name]
+
+def reset_indexes():
+    with _records_lock:
+        _records.clear()
+    _local.indexes = {}
+    cache.clear()
+
+class LookupCache:
+    def __init__(self, max_size=200000, cell_size=0.1):
+        self.max_size = max_size
+        self.cell_size = cell_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def reset_counters(self):
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+    def key(self, layer, lon, lat):
+        return layer, math.floor(lon / self.cell_size), math.floor(lat / self.cell_size)
+
+    def lookup(self, layer, lon, lat):
+        key = self.key(layer, lon, lat)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+
+        cached = entry is not None
+        if not cached:
+            _, cx, cy = key
+            entry = get_index(layer).classify_box(
+                cx * self.cell_size, cy * self.cell_size,
+                (cx + 1) * self.cell_size, (cy + 1) * self.cell_size,
+            )
+            self.store(key, entry)
+
+        boundary, label = entry
+        with self.lock:
+            if cached and not boundary:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if boundary:
+            return get_index(layer).lookup(lon, lat)
+        return label
+
+    def store(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def load(self, path):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        if data.get("cell_size") != self.cell_size or data.get("layers") != layer_signature():
+            return 0
+
+        with self.lock:
+            for layer, cx, cy, boundary, label in data.get("entries", [])[-self.max_size:]:
+                self.entries[(layer, cx, cy)] = (boundary, label)
+        return len(self.entries)
+
+    def save(self, path):
+        with self.lock:
+            entries = [[layer, cx, cy, boundary, label] for (layer, cx, cy), (boundary, label) in self.entries.items()]
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"cell_size": self.cell_size, "layers": layer_signature(), "entries": entries}, f)
+        os.replace(tmp_path, path)
+
+def layer_signature():
+    return {name: len(load_records(name)) for name in ("plates", "countries")}
+
+cache = LookupCache(max_size=int(os.getenv("GEOCODE_CACHE_SIZE", 200000)))
+
+def lookup_plate(lon, lat):
+    return cache.lookup("plates", lon, lat)
+
+def lookup_country(lon, lat):
+    return cache.lookup("countries", lon, lat)
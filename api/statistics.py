@@ -0,0 +1,218 @@
+import math
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, IntegerField, Max, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Floor, Round, TruncDate
+from rest_framework.exceptions import ValidationError
+
+from .caching import bump_catalog_version
+from .models import ChangedDay, DailyRegionStat, Earthquake, LargestEvent, MagnitudeBinStat, SyncState
+
+REGION_FIELDS = {
+    "plate": "tectonic_plate",
+    "country": "origin_country",
+}
+
+LARGEST_WINDOWS = {
+    "24h": datetime.timedelta(hours=24),
+    "7d": datetime.timedelta(days=7),
+    "30d": datetime.timedelta(days=30),
+}
+LARGEST_LIMIT = 10
+
+BIN_WIDTH = 0.1
+MAX_DAYS = 36500
+
+def get_touched_days(origin_times, margin_seconds=0):
+    margin = datetime.timedelta(seconds=margin_seconds)
+    days = set()
+    for t in origin_times:
+        if t is None:
+            continue
+        t = t.astimezone(datetime.UTC)
+        days.update(((t - margin).date(), t.date(), (t + margin).date()))
+    return sorted(days)
+
+def record_changed_days(origin_times):
+    days = get_touched_days(origin_times)
+    now = datetime.datetime.now(datetime.UTC)
+    ChangedDay.objects.bulk_create(
+        [ChangedDay(day=day, changed_at=now) for day in days],
+        update_conflicts=True,
+        unique_fields=["day"],
+        update_fields=["changed_at"],
+    )
+    return len(days)
+
+def get_changed_days(since):
+    changed = list(ChangedDay.objects.filter(changed_at__gt=since).values_list("day", "changed_at"))
+    return sorted(day for day, _ in changed), max((c for _, c in changed), default=since)
+
+def day_filter(days):
+    condition = Q()
+    for day in days:
+        start = datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.UTC)
+        condition |= Q(origin_time__gte=start, origin_time__lt=start + datetime.timedelta(days=1))
+    return condition
+
+def canonical_events(days=None):
+    queryset = Earthquake.objects.filter(duplicate_of__isnull=True)
+    if days is not None:
+        queryset = queryset.filter(day_filter(days))
+    return queryset.order_by().annotate(day=TruncDate("origin_time", tzinfo=datetime.UTC))
+
+def build_daily_region_stats(days=None):
+    rows = []
+    for region_type, field in REGION_FIELDS.items():
+        grouped = (
+            canonical_events(days).values("day", field)
+            .annotate(
+                event_count=Count("id"),
+                max_magnitude=Max("magnitude"),
+                magnitude_sum=Coalesce(Sum("magnitude"), Value(0.0), output_field=FloatField()),
+                magnitude_count=Count("magnitude"),
+            )
+        )
+        for row in grouped:
+            rows.append(DailyRegionStat(region_type=region_type, region=row.pop(field), **row))
+    return rows
+
+def build_magnitude_bins(days=None):
+    grouped = (
+        canonical_events(days).exclude(magnitude__isnull=True)
+        .annotate(magnitude_bin=Cast(Floor(Round(F("magnitude") * 10, 6)), IntegerField()))
+        .values("day", "magnitude_bin")
+        .annotate(event_count=Count("id"))
+    )
+    return [MagnitudeBinStat(**row) for row in grouped]
+
+def build_largest_events(now):
+    rows = []
+    for window, span in LARGEST_WINDOWS.items():
+        ids = (
+            Earthquake.objects.filter(duplicate_of__isnull=True, magnitude__isnull=False, origin_time__gte=now - span)
+            .order_by("-magnitude", "-origin_time")
+            .values_list("id", flat=True)[:LARGEST_LIMIT]
+        )
+        rows.extend(LargestEvent(window=window, rank=rank, earthquake_id=pk) for rank, pk in enumerate(ids, start=1))
+    return rows
+
+def refresh_statistics(full_rebuild=False):
+    state, _ = SyncState.objects.get_or_create(key="stats_high_water_mark")
+    high_water_mark = state.last_sync_end
+    now = datetime.datetime.now(datetime.UTC)
+
+    if full_rebuild or high_water_mark is None:
+        days = None
+        new_mark = ChangedDay.objects.aggregate(m=Max("changed_at"))["m"]
+    else:
+        days, new_mark = get_changed_days(high_water_mark)
+
+    with transaction.atomic():
+        if days is None:
+            DailyRegionStat.objects.all().delete()
+            MagnitudeBinStat.objects.all().delete()
+        elif days:
+            DailyRegionStat.objects.filter(day__in=days).delete()
+            MagnitudeBinStat.objects.filter(day__in=days).delete()
+
+        if days is None or days:
+            DailyRegionStat.objects.bulk_create(build_daily_region_stats(days), batch_size=1000)
+            MagnitudeBinStat.objects.bulk_create(build_magnitude_bins(days), batch_size=1000)
+
+        largest = build_largest_events(now)
+        ranking = sorted((row.window, row.rank, row.earthquake_id) for row in largest)
+        largest_changed = ranking != sorted(LargestEvent.objects.values_list("window", "rank", "earthquake_id"))
+        if largest_changed:
+            LargestEvent.objects.all().delete()
+            LargestEvent.objects.bulk_create(largest)
+
+        state.value = True
+        state.last_sync_end = new_mark
+        state.last_run_at = now
+        state.save()
+
+    if largest_changed:
+        bump_catalog_version(now)
+    return None if days is None else len(days)
+
+def get_days(params, default=None):
+    value = params.get("days", default)
+    if value is None:
+        return None
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({"days": "Must be an integer."})
+    if not 1 <= days <= MAX_DAYS:
+        raise ValidationError({"days": f"Must be between 1 and {MAX_DAYS}."})
+    return datetime.datetime.now(datetime.UTC).date() - datetime.timedelta(days=days - 1)
+
+def daily_statistics(params):
+    region_type = params.get("region_type", "plate")
+    if region_type not in REGION_FIELDS:
+        raise ValidationError({"region_type": f"Choose one of: {', '.join(REGION_FIELDS)}"})
+
+    queryset = DailyRegionStat.objects.filter(region_type=region_type, day__gte=get_days(params, 30))
+    if params.get("region"):
+        queryset = queryset.filter(region__iexact=params["region"])
+
+    return {
+        "region_type": region_type,
+        "results": [
+            {
+                "day": row.day,
+                "region": row.region,
+                "count": row.event_count,
+                "max_magnitude": row.max_magnitude,
+                "mean_magnitude": row.magnitude_sum / row.magnitude_count if row.magnitude_count else None,
+            }
+            for row in queryset.order_by("day", "region")
+        ],
+    }
+
+def get_completeness_magnitude(params, counts):
+    if params.get("mc") in (None, ""):
+        return max(counts, key=lambda b: (counts[b], -b))
+    try:
+        return int(math.floor(round(float(params["mc"]) * 10, 6)))
+    except ValueError:
+        raise ValidationError({"mc": "Must be a magnitude value."})
+
+def gutenberg_richter(params):
+    queryset = MagnitudeBinStat.objects.all()
+    since = get_days(params)
+    if since is not None:
+        queryset = queryset.filter(day__gte=since)
+
+    counts = dict(queryset.values("magnitude_bin").annotate(n=Sum("event_count")).values_list("magnitude_bin", "n"))
+    if not counts:
+        return {"bins": [], "mc": None, "events_above_mc": 0, "b_value": None, "a_value": None}
+
+    bins = []
+    cumulative = 0
+    for magnitude_bin in sorted(counts, reverse=True):
+        cumulative += counts[magnitude_bin]
+        bins.append({"magnitude": magnitude_bin / 10, "count": counts[magnitude_bin], "cumulative_count": cumulative})
+    bins.reverse()
+
+    mc = get_completeness_magnitude(params, counts)
+    above = {b: n for b, n in counts.items() if b >= mc}
+    total = sum(above.values())
+    b_value = a_value = None
+    if total:
+        mean = sum(b / 10 * n for b, n in above.items()) / total
+        spread = mean - (mc / 10 - BIN_WIDTH / 2)
+        if spread > 0:
+            b_value = math.log10(math.e) / spread
+            a_value = math.log10(total) + b_value * mc / 10
+
+    return {"bins": bins, "mc": mc / 10, "events_above_mc": total, "b_value": b_value, "a_value": a_value}
+
+def largest_events(params):
+    window = params.get("window", "24h")
+    if window not in LARGEST_WINDOWS:
+        raise ValidationError({"window": f"Choose one of: {', '.join(LARGEST_WINDOWS)}"})
+    ranked = LargestEvent.objects.filter(window=window).select_related("earthquake").order_by("rank")
+    return [row.earthquake for row in ranked]
@@ -0,0 +1,129 @@
+import json
+import asyncio
+from collections import Counter
+
+import httpx
+
+USGS_EVENT_ID = "us7000test"
+CONTOUR_URL = f"https://earthquake.usgs.gov/product/shakemap/{USGS_EVENT_ID}/us/1/download/cont_mmi.json"
+
+USGS_PAYLOAD = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "id": USGS_EVENT_ID,
+            "properties": {
+                "mag": 5.1, "magType": "mww", "place": "12 km N of Testville",
+                "time": 1704067200000, "updated": 1704067500000,
+                "type": "earthquake", "tsunami": 0, "types": ",origin,shakemap,",
+            },
+            "geometry": {"type": "Point", "coordinates": [20.0, 10.0, 12.5]},
+        },
+        {
+            "type": "Feature",
+            "id": "us7000blast",
+            "properties": {"mag": 2.0, "time": 1704067300000, "type": "quarry blast"},
+            "geometry": {"type": "Point", "coordinates": [21.0, 11.0, 0.0]},
+        },
+    ],
+}
+
+EMSC_PAYLOAD = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "id": "20240101_0000001",
+            "properties": {
+                "unid": "20240101_0000001", "mag": 4.8, "magtype": "mb",
+                "flynn_region": "TESTVILLE REGION", "time": "2024-01-01T00:00:03.0Z",
+                "lastupdate": "2024-01-01T00:10:00.0Z", "evtype": "ke",
+            },
+            "geometry": {"type": "Point", "coordinates": [20.01, 10.02, -10.0]},
+        },
+    ],
+}
+
+IGN_PAYLOAD = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {
+                "evid": "es2024aaaaa", "mag": 2.3, "magtype": "mbLg",
+                "loc": "ATLANTICO-GALICIA", "depth": 8, "fecha": "2024-01-01T01:00:00",
+            },
+            "geometry": {"type": "Point", "coordinates": [-9.5, 42.1]},
+        },
+    ],
+}
+
+SHAKEMAP_DETAIL = {
+    "properties": {
+        "products": {
+            "shakemap": [{"contents": {"download/cont_mmi.json": {"url": CONTOUR_URL}}}],
+        },
+    },
+}
+
+CONTOURS = {
+    "features": [
+        {
+            "properties": {"value": 4.0},
+            "geometry": {"coordinates": [[[19.9, 9.9], [20.1, 9.9], [20.1, 10.1], [19.9, 9.9]]]},
+        },
+    ],
+}
+
+def json_body(data):
+    return json.dumps(data).encode("utf-8")
+
+class StubFeedServer:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.routes = {}
+        self.requests = []
+        self.active = Counter()
+        self.peak = Counter()
+
+    def route(self, url, *responses, **params):
+        url = httpx.URL(url)
+        self.routes[(url.host, url.path, frozenset(params.items()))] = list(responses)
+
+    def serve_catalog(self, urls):
+        self.route(urls["USGS"], (200, json_body(USGS_PAYLOAD)))
+        self.route(urls["EMSC"], (200, json_body(EMSC_PAYLOAD)))
+        self.route(urls["IGN"], (200, b"var dias3 = " + json_body(IGN_PAYLOAD) + b";\nvar otra = 1;"))
+        self.route(urls["USGS"], (200, json_body(SHAKEMAP_DETAIL)), eventid=USGS_EVENT_ID)
+        self.route(CONTOUR_URL, (200, json_body(CONTOURS)))
+
+    def find_route(self, request):
+        matches = [
+            (len(params), responses)
+            for (host, path, params), responses in self.routes.items()
+            if host == request.url.host and path == request.url.path
+            and all(request.url.params.get(k) == v for k, v in params)
+        ]
+        return max(matches, key=lambda m: m[0])[1] if matches else None
+
+    async def handle(self, request):
+        host = request.url.host
+        self.requests.append(request)
+        self.active[host] += 1
+        self.peak[host] = max(self.peak[host], self.active[host])
+        try:
+            await asyncio.sleep(self.delay)
+            responses = self.find_route(request)
+            if responses is None:
+                return httpx.Response(404)
+            response = responses[0] if len(responses) == 1 else responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            status, body = response
+            return httpx.Response(status, content=body)
+        finally:
+            self.active[host] -= 1
+
+    def transport(self):
+        return httpx.MockTransport(self.handle)
@@ -0,0 +1,107 @@
+import os
+import sys
+import asyncio
+
+import httpx
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from .feeds import CONTOURS, StubFeedServer, USGS_EVENT_ID
+
+sys.path.append(os.path.join(settings.BASE_DIR, "scripts"))
+
+import earthquake_pipeline as pipeline
+
+FEED_URLS = {source: url for source, (url, _, _) in pipeline.FEEDS.items()}
+TEST_URL = "https://feeds.example.org/query"
+
+class AsyncFetcherTest(SimpleTestCase):
+    def run_fetcher(self, fetcher, *coroutines):
+        async def main():
+            try:
+                return await asyncio.gather(*(c(fetcher) for c in coroutines), return_exceptions=True)
+            finally:
+                await fetcher.aclose()
+        return asyncio.run(main())
+
+    def test_requests_per_host_never_exceed_the_limit(self):
+        server = StubFeedServer(delay=0.02)
+        server.route(TEST_URL, (200, b"{}"))
+        server.route("https://other.example.org/query", (200, b"{}"))
+        fetcher = pipeline.AsyncFetcher(max_per_host=2, transport=server.transport())
+
+        results = self.run_fetcher(
+            fetcher,
+            *[lambda f: f.get(TEST_URL)] * 6,
+            *[lambda f: f.get("https://other.example.org/query")] * 3,
+        )
+
+        self.assertEqual([r.status_code for r in results], [200] * 9)
+        self.assertEqual(server.peak["feeds.example.org"], 2)
+        self.assertEqual(server.peak["other.example.org"], 2)
+
+    def test_retries_server_errors_and_transport_errors(self):
+        server = StubFeedServer()
+        server.route(TEST_URL, (503, b""), httpx.ConnectError("refused"), (200, b"ok"))
+        fetcher = pipeline.AsyncFetcher(retries=3, backoff=0, transport=server.transport())
+
+        [response] = self.run_fetcher(fetcher, lambda f: f.get(TEST_URL))
+
+        self.assertEqual(response.content, b"ok")
+        self.assertEqual(len(server.requests), 3)
+
+    def test_gives_up_after_the_last_retry(self):
+        server = StubFeedServer()
+        server.route(TEST_URL, (503, b""))
+        fetcher = pipeline.AsyncFetcher(retries=2, backoff=0, transport=server.transport())
+
+        [result] = self.run_fetcher(fetcher, lambda f: f.get(TEST_URL))
+
+        self.assertIsInstance(result, httpx.HTTPStatusError)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_client_errors_are_not_retried(self):
+        server = StubFeedServer()
+        fetcher = pipeline.AsyncFetcher(retries=3, backoff=0, transport=server.transport())
+
+        [response] = self.run_fetcher(fetcher, lambda f: f.get(TEST_URL))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(server.requests), 1)
+
+class AsyncAcquisitionTest(TestCase):
+    def setUp(self):
+        self.window = pipeline.init_sync_window()
+        self.server = StubFeedServer()
+        self.server.serve_catalog(FEED_URLS)
+        self.acquisition = pipeline.AsyncAcquisition(backoff=0, transport=self.server.transport())
+
+    def tearDown(self):
+        self.acquisition.close()
+
+    def test_fetches_and_parses_every_source(self):
+        pending = {}
+        events = self.acquisition.fetch_events(self.window, pending=pending)
+
+        self.assertEqual(sorted(e["source"] for e in events), ["EMSC", "IGN", "USGS"])
+        self.assertEqual(set(pending), {"EMSC", "IGN", "USGS"})
+
+    def test_failing_feed_does_not_block_the_others(self):
+        self.server.route(FEED_URLS["USGS"], (500, b""))
+
+        pending = {}
+        events = self.acquisition.fetch_events(self.window, pending=pending)
+
+        self.assertEqual(sorted(e["source"] for e in events), ["EMSC", "IGN"])
+        self.assertNotIn("USGS", pending)
+
+    def test_prefetches_contours_and_tolerates_missing_shakemaps(self):
+        events = self.acquisition.fetch_events(self.window, pending={})
+        usgs = next(e for e in events if e["source"] == "USGS")
+        missing = {**usgs, "source_id": "USGS_us7000none", "global_id": "missing"}
+
+        self.acquisition.prefetch_contours([usgs, missing], existing={})
+
+        self.assertEqual(usgs["source_id"], f"USGS_{USGS_EVENT_ID}")
+        self.assertEqual(usgs["prefetched_contours"], pipeline.parse_contours(CONTOURS))
+        self.assertEqual(missing["prefetched_contours"], [])
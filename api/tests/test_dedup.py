@@ -0,0 +1,75 @@
+import os
+import sys
+import math
+import datetime
+
+from django.conf import settings
+from django.test import TransactionTestCase
+
+from api.models import DuplicateLink, Earthquake
+
+sys.path.append(os.path.join(settings.BASE_DIR, "scripts"))
+
+import earthquake_pipeline as pipeline
+
+BASE_TIME = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+KM_PER_DEGREE = math.pi * pipeline.EARTH_RADIUS_KM / 180
+THRESHOLDS = {"dt_threshold": 8, "dd_threshold": 8, "dm_threshold": 0.5}
+
+class DedupEngineEquivalenceTest(TransactionTestCase):
+    def add_event(self, group, source, seconds=0.0, north_km=0.0, magnitude=4.0, suffix=""):
+        name = f"{group}{suffix}"
+        return Earthquake.objects.create(
+            global_id=f"{source}::{name}",
+            source=source,
+            source_id=f"{source}_{name}",
+            origin_time=BASE_TIME + datetime.timedelta(hours=group, seconds=seconds),
+            latitude=10.0 + north_km / KM_PER_DEGREE,
+            longitude=20.0,
+            magnitude=magnitude,
+        )
+
+    def setUp(self):
+        e = self.add_event
+        self.expected = {
+            ("dt on the threshold", e(1, "USGS"), e(1, "EMSC", seconds=8)),
+            ("dm on the threshold", e(3, "USGS", magnitude=4.5), e(3, "EMSC", magnitude=4.0)),
+            ("dd inside the threshold", e(5, "USGS"), e(5, "EMSC", north_km=7.5)),
+            ("higher priority source reported later", e(9, "USGS", seconds=4), e(9, "IGN")),
+        }
+        usgs, ign, emsc = e(10, "USGS"), e(10, "IGN", seconds=1), e(10, "EMSC", seconds=2)
+        self.expected |= {
+            ("three sources", usgs, ign),
+            ("three sources", usgs, emsc),
+            ("three sources", ign, emsc),
+        }
+
+        self.rejected = [
+            e(2, "USGS"), e(2, "EMSC", seconds=8.5),
+            e(4, "USGS", magnitude=4.75), e(4, "EMSC", magnitude=4.0),
+            e(6, "USGS"), e(6, "EMSC", north_km=8.5),
+            e(7, "USGS", suffix="a"), e(7, "USGS", seconds=1, suffix="b"),
+            e(8, "USGS", magnitude=None), e(8, "EMSC"),
+        ]
+
+    def find_links(self, engine):
+        DuplicateLink.objects.all().delete()
+        Earthquake.objects.update(duplicate_of=None)
+
+        pipeline.mark_duplicates(full_rebuild=True, engine=engine, **THRESHOLDS)
+        return set(DuplicateLink.objects.values_list("canonical_id", "duplicate_id"))
+
+    def test_engines_match_python_reference(self):
+        reference = self.find_links("python")
+        self.assertEqual(reference, {(canonical.id, duplicate.id) for _, canonical, duplicate in self.expected})
+
+        for engine in ("sql", "numpy"):
+            with self.subTest(engine=engine):
+                self.assertEqual(self.find_links(engine), reference)
+
+    def test_rejected_pairs_are_never_linked(self):
+        rejected = {event.id for event in self.rejected}
+        for engine in sorted(pipeline.DEDUP_ENGINES):
+            with self.subTest(engine=engine):
+                linked = {i for pair in self.find_links(engine) for i in pair}
+                self.assertFalse(linked & rejected)
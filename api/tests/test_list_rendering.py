@@ -0,0 +1,76 @@
+import io
+import json
+import datetime
+from contextlib import redirect_stdout
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.export import feature_collection, feature_rows
+from api.models import Earthquake
+from api.serializers import EarthquakeListSerializer
+from api.views import EarthquakeViewSet
+
+class FastListRenderingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime.datetime(2024, 1, 1, 12, 30, 15, 250000, tzinfo=datetime.UTC)
+        canonical = Earthquake.objects.create(
+            global_id="render-0", source="USGS", source_id="USGS_us0", origin_time=start,
+            latitude=10.123456, longitude=-20.654321, magnitude=5.4, mag_type="mww", depth_km=10.0,
+            place_name="12 km N of Testville", origin_country="Testland", tectonic_plate="Test Plate",
+            affected_countries=["Testland", "Otherland"], tsunami=True, has_curves=True,
+            updated_time=start + datetime.timedelta(minutes=5), retrieved_time=start + datetime.timedelta(minutes=6),
+        )
+        Earthquake.objects.create(
+            global_id="render-1", source="EMSC", source_id="EMSC_1", origin_time=start + datetime.timedelta(seconds=3),
+            latitude=10.12, longitude=-20.65, magnitude=5.2, duplicate_of=canonical,
+        )
+        Earthquake.objects.create(
+            global_id="render-2", source="IGN", source_id="IGN_es2", origin_time=start - datetime.timedelta(days=1),
+            latitude=42.1, longitude=-9.5, magnitude=None, mag_type=None, depth_km=None, place_name=None,
+            affected_countries=[], tsunami=None, has_curves=None,
+        )
+
+    def render_both(self, query=None):
+        request = Request(APIRequestFactory().get("/api/earthquakes/", query or {}))
+        view = EarthquakeViewSet(request=request, action="list", format_kwarg=None, args=(), kwargs={})
+        queryset = view.get_queryset()
+        fields = view.get_requested_fields()
+
+        serializer_kwargs = {"fields": fields} if query else {}
+        expected = EarthquakeListSerializer(list(queryset), many=True, **serializer_kwargs).data
+
+        properties, rows = feature_rows(queryset, fields)
+        actual = feature_collection(list(rows), properties)
+        return JSONRenderer().render(expected), JSONRenderer().render(actual)
+
+    def assertFeaturesMatch(self, expected, actual):
+        expected, actual = json.loads(expected), json.loads(actual)
+        self.assertEqual(len(expected["features"]), len(actual["features"]))
+        for e, a in zip(expected["features"], actual["features"]):
+            self.assertEqual(list(e), list(a))
+            self.assertEqual(e["id"], a["id"])
+            self.assertEqual(e["geometry"], a["geometry"])
+            self.assertEqual(list(e["properties"]), list(a["properties"]))
+            for field, value in e["properties"].items():
+                self.assertEqual(value, a["properties"][field], field)
+
+    def test_fast_path_matches_serializer_for_every_list_field(self):
+        expected, actual = self.render_both()
+        self.assertFeaturesMatch(expected, actual)
+        self.assertEqual(expected, actual)
+
+    def test_fast_path_matches_serializer_for_selected_fields(self):
+        expected, actual = self.render_both({"fields": "magnitude,origin_time,duplicate_of"})
+        self.assertFeaturesMatch(expected, actual)
+        self.assertEqual(expected, actual)
+
+    def test_benchmark_command_reports_identical_output(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            call_command("benchmark_list", page_sizes="1,3", repeat=1)
+        self.assertEqual(output.getvalue().count("identical output: True"), 2, output.getvalue())
@@ -0,0 +1,64 @@
+import datetime
+
+from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Earthquake
+from api.views import EarthquakeViewSet
+
+LOCATION_INDEX = f"{Earthquake._meta.db_table}_location_id"
+TRIGRAM_INDEXES = ["api_eq_place_name_trgm", "api_eq_source_id_trgm", "api_eq_origin_country_trgm", "api_eq_tectonic_plate_trgm"]
+
+class FilterQueryPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+        events = []
+        for i in range(500):
+            lon, lat = -170 + (i * 7) % 340, -60 + (i * 3) % 120
+            events.append(Earthquake(
+                global_id=f"plan-{i}", source=["USGS", "EMSC", "IGN"][i % 3], source_id=f"TEST_{i}",
+                origin_time=start + datetime.timedelta(hours=i), latitude=lat, longitude=lon,
+                location=Point(lon, lat, srid=4326), magnitude=1 + (i % 70) / 10, depth_km=i % 300,
+                place_name=f"{i} km N of Testville", origin_country="Testland", tectonic_plate="Test Plate",
+            ))
+        Earthquake.objects.bulk_create(events)
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(Earthquake._meta.db_table)}")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def filtered(self, query):
+        request = Request(APIRequestFactory().get("/api/earthquakes/", query))
+        view = EarthquakeViewSet(request=request, action="list", format_kwarg=None, args=(), kwargs={})
+        return view.filter_queryset(view.get_queryset())
+
+    def assertPlanUses(self, queryset, *indexes):
+        plan = queryset.explain()
+        for index in indexes:
+            self.assertIn(index, plan, plan)
+
+    def test_search_uses_trigram_indexes(self):
+        self.assertPlanUses(self.filtered({"search": "estvil"}).order_by(), *TRIGRAM_INDEXES)
+
+    def test_magnitude_range_uses_magnitude_index(self):
+        self.assertPlanUses(self.filtered({"magnitude_min": "6", "magnitude_max": "7"}).order_by(), "api_earthqu_magnitu_15227e_idx")
+
+    def test_depth_range_uses_depth_index(self):
+        self.assertPlanUses(self.filtered({"depth_km_min": "100", "depth_km_max": "120"}).order_by(), "api_earthqu_depth_k_08ecb7_idx")
+
+    def test_origin_time_range_uses_a_time_index(self):
+        plan = self.filtered({"origin_time_after": "2024-01-05T00:00:00Z", "origin_time_before": "2024-01-06T00:00:00Z"}).order_by().explain()
+        self.assertTrue(any(index in plan for index in ["api_earthqu_origin__3d963c_idx", "api_eq_origin_time_brin"]), plan)
+
+    def test_radius_uses_location_index(self):
+        self.assertPlanUses(self.filtered({"near": "20,10", "radius_km": "500"}).order_by(), LOCATION_INDEX)
+
+    def test_nearest_uses_knn_index_scan(self):
+        queryset = self.filtered({"near": "20,10", "nearest": "5"})
+        self.assertPlanUses(queryset, LOCATION_INDEX)
+        self.assertIn("Index Scan", queryset.explain())
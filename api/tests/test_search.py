@@ -0,0 +1,43 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Earthquake
+from api.views import EarthquakeViewSet
+
+class CatalogSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+        for i, (global_id, source_id, place_name) in enumerate([
+            ("usgs-us7000abc", "us7000abc", "10 km S of Testville"),
+            ("usgs-us7000abcd", "us7000abcd", "20 km N of Otherville"),
+            ("emsc-1", "1", "Near us7000abc station"),
+            ("ign-2", "2", "Unrelated"),
+        ]):
+            Earthquake.objects.create(
+                global_id=global_id, source="TEST", source_id=source_id, place_name=place_name,
+                origin_time=start + datetime.timedelta(hours=i), latitude=0.0, longitude=0.0, magnitude=4.0,
+            )
+
+    def search(self, term):
+        request = Request(APIRequestFactory().get("/api/earthquakes/", {"search": term}))
+        view = EarthquakeViewSet(request=request, action="list", format_kwarg=None, args=(), kwargs={})
+        return list(view.filter_queryset(view.get_queryset()).values_list("global_id", flat=True))
+
+    def test_exact_source_id_keeps_contains_matches(self):
+        results = self.search("us7000abc")
+        self.assertEqual(results[0], "usgs-us7000abc")
+        self.assertEqual(set(results), {"usgs-us7000abc", "usgs-us7000abcd", "emsc-1"})
+
+    def test_exact_global_id_is_listed_first(self):
+        results = self.search("ign-2")
+        self.assertEqual(results, ["ign-2"])
+
+    def test_contains_search_without_exact_hit(self):
+        self.assertEqual(self.search("ville"), ["usgs-us7000abcd", "usgs-us7000abc"])
+
+    def test_multiple_terms_use_contains_search(self):
+        self.assertEqual(self.search("us7000abc Near"), ["emsc-1"])
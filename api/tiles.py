@@ -0,0 +1,106 @@
+import math
+import time
+import hashlib
+
+from django.core.cache import cache
+from django.db import connection
+
+from .caching import get_catalog_version, get_version_token
+from .models import Earthquake
+
+MAX_ZOOM = 22
+CACHED_MAX_ZOOM = 14
+TILE_TIMEOUT = 3600
+TILE_FEATURE_LIMIT = 20000
+
+MAGNITUDE_FLOORS = [(2, 5.0), (4, 4.0), (6, 3.0), (8, 2.0)]
+
+TILE_SQL = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%s, %s, %s) AS geom
+),
+mvtgeom AS (
+    SELECT
+        ST_AsMVTGeom(ST_Transform(e.location::geometry, 3857), bounds.geom) AS geom,
+        e.id, e.source, e.magnitude, e.mag_type, e.depth_km,
+        e.origin_time::text AS origin_time, e.place_name, e.tsunami
+    FROM {earthquake} e, bounds
+    WHERE e.location::geometry(Geometry, 4326) && ST_Transform(bounds.geom, 4326)
+      AND e.id IN ({filtered})
+    ORDER BY e.magnitude DESC NULLS LAST
+    LIMIT %s
+)
+SELECT ST_AsMVT(mvtgeom.*, 'earthquakes', 4096, 'geom', 'id') FROM mvtgeom
+"""
+
+def magnitude_floor(z):
+    for max_zoom, floor in MAGNITUDE_FLOORS:
+        if z <= max_zoom:
+            return floor
+    return None
+
+def is_valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+def tile_for_point(lon, lat, z):
+    lat = max(min(lat, 85.0511), -85.0511)
+    n = 2 ** z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_version_key(z, x, y):
+    return f"mvt:version:{z}:{x}:{y}"
+
+def get_tile_version(z, x, y):
+    version = cache.get(tile_version_key(z, x, y))
+    if version is None:
+        return f"c{get_version_token(get_catalog_version())}"
+    return version
+
+def tile_cache_key(z, x, y, query_string):
+    version = get_tile_version(z, x, y)
+    digest = hashlib.sha256(query_string.encode("utf-8")).hexdigest()[:16]
+    return f"mvt:{z}:{x}:{y}:{version}:{digest}"
+
+def normalize_query(query_params):
+    return "&".join(f"{k}={v}" for k, v in sorted(query_params.items()) if v != "")
+
+def render_tile(queryset, z, x, y):
+    floor = magnitude_floor(z)
+    queryset = queryset.order_by().exclude(location__isnull=True)
+    if floor is not None:
+        queryset = queryset.filter(magnitude__gte=floor)
+
+    filtered_sql, filtered_params = queryset.values("id").query.sql_with_params()
+    sql = TILE_SQL.format(
+        earthquake=connection.ops.quote_name(Earthquake._meta.db_table),
+        filtered=filtered_sql,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [z, x, y, *filtered_params, TILE_FEATURE_LIMIT])
+        row = cursor.fetchone()
+    return bytes(row[0]) if row and row[0] is not None else b""
+
+def get_tile(queryset, z, x, y, query_params):
+    if z > CACHED_MAX_ZOOM:
+        return render_tile(queryset, z, x, y)
+
+    key = tile_cache_key(z, x, y, normalize_query(query_params))
+    tile = cache.get(key)
+    if tile is None:
+        tile = render_tile(queryset, z, x, y)
+        cache.set(key, tile, TILE_TIMEOUT)
+    return tile
+
+def invalidate_tiles(points):
+    touched = set()
+    for lon, lat in points:
+        if lon is None or lat is None:
+            continue
+        for z in range(CACHED_MAX_ZOOM + 1):
+            touched.add((z, *tile_for_point(lon, lat, z)))
+
+    version = f"t{time.time_ns()}"
+    cache.set_many({tile_version_key(z, x, y): version for z, x, y in touched}, None)
+    return len(touched)
@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EarthquakeViewSet
+from .views import EarthquakeViewSet, StatisticsViewSet, MetadataViewSet, earthquake_tile
 
 router = DefaultRouter()
 router.register(r"earthquakes", EarthquakeViewSet)
+router.register(r"stats", StatisticsViewSet, basename="stats")
+router.register(r"metadata", MetadataViewSet, basename="metadata")
 
 urlpatterns = [
     path("api/", include(router.urls)),
+    path("tiles/<int:z>/<int:x>/<int:y>.mvt", earthquake_tile, name="earthquake-tile"),
 ]
\ No newline at end of file
@@ -1,15 +1,30 @@
+from django.contrib.gis.measure import D
+from django.http import Http404, HttpResponse
 from rest_framework import viewsets, filters
+from rest_framework.request import Request
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
 from rest_framework_gis.filters import InBBoxFilter
 from django_filters.rest_framework import DjangoFilterBackend
 import django_filters
 
 from .models import Earthquake
-from .serializers import EarthquakeSerializer
+from .serializers import EarthquakeSerializer, EarthquakeListSerializer, EARTHQUAKE_FIELDS, INTERNAL_FIELDS, LIST_FIELDS, REQUIRED_FIELDS
+from .export import EXPORT_FORMATS, feature_collection, feature_rows, streaming_export
+from .columnar import COLUMNAR_FORMATS, columnar_response
+from .tiles import get_tile, is_valid_tile
+from .aggregation import aggregate_events
+from .statistics import daily_statistics, gutenberg_richter, largest_events
+from .caching import catalog_cached
+from .metadata import get_filter_metadata, get_source_choices
+from .search import CatalogSearchFilter, NearestFilter, parse_point
+from .pagination import EarthquakePageNumberPagination, KeysetPagination, use_keyset_pagination
 
 class EarthquakeFilter(django_filters.FilterSet):
     source = django_filters.ChoiceFilter(
         label="Source",
-        choices=lambda: [(s, s) for s in Earthquake.objects.values_list("source", flat=True).distinct()],
+        choices=get_source_choices,
     )
 
     origin_country = django_filters.CharFilter(
@@ -28,9 +43,36 @@ class EarthquakeFilter(django_filters.FilterSet):
         field_name="tsunami", label="Tsunami"
     )
 
+    origin_time = django_filters.IsoDateTimeFromToRangeFilter(
+        field_name="origin_time", label="Origin Time (origin_time_after / origin_time_before)"
+    )
+
+    magnitude = django_filters.RangeFilter(
+        field_name="magnitude", label="Magnitude (magnitude_min / magnitude_max)"
+    )
+
+    depth_km = django_filters.RangeFilter(
+        field_name="depth_km", label="Depth km (depth_km_min / depth_km_max)"
+    )
+
+    near = django_filters.CharFilter(method="filter_near", label="Near (lon,lat)")
+    radius_km = django_filters.NumberFilter(method="filter_radius", label="Radius km around near")
+
     class Meta:
         model = Earthquake
-        fields = ["source", "origin_country", "tectonic_plate", "tsunami"]
+        fields = ["source", "origin_country", "tectonic_plate", "tsunami", "origin_time", "magnitude", "depth_km", "near", "radius_km"]
+
+    def filter_near(self, queryset, name, value):
+        parse_point(value)
+        return queryset
+
+    def filter_radius(self, queryset, name, value):
+        if value is None:
+            return queryset
+        if value <= 0:
+            raise ValidationError({"radius_km": "Must be greater than zero."})
+        point = parse_point(self.data.get("near"))
+        return queryset.filter(location__dwithin=(point, D(km=value)))
 
 class EarthquakeViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Earthquake.objects.all().order_by("-origin_time")
@@ -38,9 +80,10 @@ class EarthquakeViewSet(viewsets.ReadOnlyModelViewSet):
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        CatalogSearchFilter,
         filters.OrderingFilter,
         InBBoxFilter,
+        NearestFilter,
     ]
 
     filterset_class = EarthquakeFilter
@@ -48,3 +91,126 @@ class EarthquakeViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ["origin_time", "retrieved_time", "magnitude", "depth_km"]
     bbox_filter_field = "location"
     bbox_filter_include_overlapping = True
+    fast_list = True
+
+    def get_serializer_class(self):
+        if self.action == "list" and "raw_data" not in self.get_requested_fields():
+            return EarthquakeListSerializer
+        return EarthquakeSerializer
+
+    def get_requested_fields(self):
+        if hasattr(self, "_requested_fields"):
+            return self._requested_fields
+
+        params = self.request.query_params
+        fields = None
+        if params.get("fields"):
+            fields = [f.strip() for f in params["fields"].split(",") if f.strip()]
+            unknown = sorted(set(fields) - set(EARTHQUAKE_FIELDS))
+            if unknown:
+                raise ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}"})
+
+        expand = [f.strip() for f in params.get("expand", "").split(",") if f.strip()]
+        if "raw_data" in expand:
+            fields = (fields or LIST_FIELDS) + ["raw_data"]
+        if fields:
+            fields = [name for name in EARTHQUAKE_FIELDS if name in fields]
+
+        self._requested_fields = fields or (LIST_FIELDS if self.action in ("list", "export") else EARTHQUAKE_FIELDS)
+        return self._requested_fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request is not None and (self.request.query_params.get("fields") or self.request.query_params.get("expand")):
+            kwargs.setdefault("fields", self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request is None:
+            return queryset
+
+        fields = set(self.get_requested_fields()) | set(REQUIRED_FIELDS) | {"origin_time"}
+        deferred = [name for name in EARTHQUAKE_FIELDS if name not in fields and name != "raw_data"] + INTERNAL_FIELDS
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        if "raw_data" in fields:
+            queryset = queryset.select_related("raw_payload")
+        return queryset
+
+    @catalog_cached
+    def list(self, request, *args, **kwargs):
+        if not self.fast_list:
+            return super().list(request, *args, **kwargs)
+
+        properties, rows = feature_rows(self.filter_queryset(self.get_queryset()), self.get_requested_fields())
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(feature_collection(page, properties))
+        return Response(feature_collection(rows, properties))
+
+    @catalog_cached
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        output = request.query_params.get("output", "geojson")
+        if output not in EXPORT_FORMATS and output not in COLUMNAR_FORMATS:
+            raise ValidationError({"output": f"Unsupported format. Choose one of: {', '.join([*EXPORT_FORMATS, *COLUMNAR_FORMATS])}"})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if output in COLUMNAR_FORMATS:
+            return columnar_response(queryset, self.get_requested_fields(), output)
+        return streaming_export(queryset, self.get_requested_fields(), output)
+
+    @action(detail=False, methods=["get"])
+    @catalog_cached
+    def aggregate(self, request):
+        queryset = self.filter_queryset(Earthquake.objects.all())
+        return Response(aggregate_events(queryset, request.query_params))
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.request is not None and use_keyset_pagination(self.request):
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = EarthquakePageNumberPagination()
+        return self._paginator
+
+class StatisticsViewSet(viewsets.ViewSet):
+    @action(detail=False, methods=["get"])
+    @catalog_cached
+    def daily(self, request):
+        return Response(daily_statistics(request.query_params))
+
+    @action(detail=False, methods=["get"], url_path="gutenberg-richter")
+    @catalog_cached
+    def gutenberg_richter(self, request):
+        return Response(gutenberg_richter(request.query_params))
+
+    @action(detail=False, methods=["get"])
+    @catalog_cached
+    def largest(self, request):
+        return Response(EarthquakeListSerializer(largest_events(request.query_params), many=True).data)
+
+class MetadataViewSet(viewsets.ViewSet):
+    @catalog_cached
+    def list(self, request):
+        return Response(get_filter_metadata())
+
+def earthquake_tile(request, z, x, y):
+    if not is_valid_tile(z, x, y):
+        raise Http404("Tile out of range")
+
+    drf_request = Request(request)
+    viewset = EarthquakeViewSet(request=drf_request, action="list", format_kwarg=None, args=(), kwargs={})
+    try:
+        queryset = viewset.filter_queryset(Earthquake.objects.all())
+    except APIException as e:
+        return HttpResponse(str(e.detail), status=e.status_code, content_type="text/plain")
+
+    tile = get_tile(queryset, z, x, y, drf_request.query_params)
+    response = HttpResponse(tile, content_type="application/vnd.mapbox-vector-tile")
+    response["Cache-Control"] = "public, max-age=60"
+    return response
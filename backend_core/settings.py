@@ -53,6 +53,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'backend_core.wsgi.application'
 
+DB_CONN_MAX_AGE = os.environ.get('DB_CONN_MAX_AGE', '0')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.contrib.gis.db.backends.postgis',
@@ -61,6 +63,8 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'postgres'),
         'HOST': os.environ.get('POSTGRES_HOST', 'db'),
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': None if DB_CONN_MAX_AGE.lower() == 'none' else int(DB_CONN_MAX_AGE),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -81,6 +85,34 @@ STATIC_ROOT = os.path.join(os.path.normpath(BASE_DIR), 'api', 'static')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHE_OPTIONS = {
+    'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 100000)),
+    'CULL_FREQUENCY': int(os.environ.get('CACHE_CULL_FREQUENCY', 10)),
+}
+
+CACHE_BACKENDS = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, 'data', 'cache')),
+        'OPTIONS': CACHE_OPTIONS,
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'seismic-catalog',
+        'OPTIONS': CACHE_OPTIONS,
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://redis:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.environ.get('CACHE_BACKEND', 'file')],
+}
+
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 3600))
+
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
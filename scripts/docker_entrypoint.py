@@ -1,5 +1,6 @@
 import os
 import time
+import signal
 import subprocess
 import sys
 
@@ -7,6 +8,7 @@ sys.path.append("/app")
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend_core.settings")
 
 MODE = os.environ.get("ENTRYPOINT_MODE", "default").lower()
+PIPELINE_MODE = os.environ.get("PIPELINE_MODE", "cron").lower()
 
 if MODE == "backup":
     print("[*] Starting in BACKUP mode.")
@@ -37,8 +39,11 @@ else:
     os.makedirs(os.path.dirname(log_path), exist_ok=True)
     open(log_path, "a").close()
 
-    subprocess.run(["service", "cron", "start"], check=True)
-    print("[✓] Cron service started.")
+    if PIPELINE_MODE == "daemon":
+        print("[*] Pipeline will run as a daemon - cron not started.")
+    else:
+        subprocess.run(["service", "cron", "start"], check=True)
+        print("[✓] Cron service started.")
 
     print("[*] Waiting for PostgreSQL to be ready...")
     host = os.environ.get("POSTGRES_HOST", "db")
@@ -97,6 +102,26 @@ else:
 
     print("[✓] Geographic layers imported")
 
+    if PIPELINE_MODE == "daemon":
+        print("[*] Starting pipeline daemon...")
+        pipeline_log = open(log_path, "a")
+        pipeline_proc = subprocess.Popen(
+            ["python", "manage.py", "run_pipeline", "--loop"],
+            stdout=pipeline_log, stderr=subprocess.STDOUT,
+            env={**os.environ, "DB_CONN_MAX_AGE": os.environ.get("PIPELINE_CONN_MAX_AGE", "none")}
+        )
+
+        def stop_pipeline(signum, frame):
+            pipeline_proc.terminate()
+            try:
+                pipeline_proc.wait(timeout=50)
+            except subprocess.TimeoutExpired:
+                print("[!] Pipeline did not stop in time - killing it")
+                pipeline_proc.kill()
+            sys.exit(0)
+
+        signal.signal(signal.SIGTERM, stop_pipeline)
+
     print("[*] Starting Django server...")
     subprocess.Popen(["python", "manage.py", "runserver", "0.0.0.0:8000"])
     subprocess.run(["tail", "-F", log_path])
\ No newline at end of file
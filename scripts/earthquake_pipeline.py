@@ -1,12 +1,20 @@
 import sys, os
+import argparse
 import re
+import math
 import json
 import hashlib
 import datetime
-from django.db import transaction, IntegrityError
+import asyncio
+import threading
+from collections import Counter
+from django.db import connection, transaction, IntegrityError
+from django.db.models import Max, Q
 from django.contrib.gis.geos import Point
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+import httpx
+import numpy as np
 from itertools import groupby
 from operator import itemgetter
 
@@ -18,58 +26,59 @@ django.setup()
 
 from django.conf import settings
 from api.models import Earthquake, DuplicateLink, IntensityCurve, Plate, Country, SyncState
+from api import caching, metadata, partitioning, provenance, spatial_index, statistics, tiles
 
 URL_IGN = "https://www.ign.es/web/resources/sismologia/tproximos/terremotos.js"
 URL_USGS = "https://earthquake.usgs.gov/fdsnws/event/1/query"
 URL_EMSC = "https://www.seismicportal.eu/fdsnws/event/1/query"
 
-state, _ = SyncState.objects.get_or_create(key="initial_sync_done")
-initial_sync = not state.value
+EARTH_RADIUS_KM = 6371.0088
 
-today = datetime.datetime.now(datetime.UTC)
-tomorrow = today + datetime.timedelta(days=1)
+LOCAL_SPATIAL_INDEX = os.getenv("LOCAL_SPATIAL_INDEX", "true").lower() == "true"
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "/app/data/geocode_cache.json")
 
-state, _ = SyncState.objects.get_or_create(key="initial_sync_done")
-initial_sync = not state.value
+FETCH_WINDOW_STEP = datetime.timedelta(minutes=15)
 
-today = datetime.datetime.now(datetime.UTC)
-tomorrow = today + datetime.timedelta(days=1)
+def floor_time(value, step=FETCH_WINDOW_STEP):
+    epoch = datetime.datetime(1970, 1, 1, tzinfo=datetime.UTC)
+    return value - (value - epoch) % step
 
-if initial_sync:
-    print("[*] Running initial sync (first execution)")
-    last_event = Earthquake.objects.order_by("-retrieved_time").only("retrieved_time").first()
-    if last_event is None:
-        start_time = today - datetime.timedelta(days=30)
-        print("[*] No events found - fetching last 30 days.")
-    else:
-        start_time = last_event.retrieved_time - datetime.timedelta(days=1)
-        print(f"[*] Found existing events - fetching from {start_time.isoformat()}")
+def init_sync_window():
+    state, _ = SyncState.objects.get_or_create(key="initial_sync_done")
+    initial_sync = not state.value
 
-    state.value = True
-    state.last_sync_start = start_time
-    state.last_sync_end = tomorrow
-    state.last_run_at = today
-    state.save()
+    today = datetime.datetime.now(datetime.UTC)
+    tomorrow = floor_time(today + datetime.timedelta(days=1))
 
-else:
-    start_time = today - datetime.timedelta(days=1)
+    if initial_sync:
+        print("[*] Running initial sync (first execution)")
+        last_event = Earthquake.objects.order_by("-retrieved_time").only("retrieved_time").first()
+        if last_event is None:
+            start_time = today - datetime.timedelta(days=30)
+            print("[*] No events found - fetching last 30 days.")
+        else:
+            start_time = last_event.retrieved_time - datetime.timedelta(days=1)
+            print(f"[*] Found existing events - fetching from {start_time.isoformat()}")
 
-    state.last_sync_start = start_time
-    state.last_sync_end = tomorrow
-    state.last_run_at = today
-    state.save()
+        state.value = True
+        state.last_sync_start = start_time
+        state.last_sync_end = tomorrow
+        state.last_run_at = today
+        state.save()
 
-params_USGS = {
-    "format": "geojson",
-    "starttime": start_time.isoformat(),
-    "endtime": tomorrow.isoformat(),
-}
+    else:
+        start_time = floor_time(today - datetime.timedelta(days=1))
 
-params_EMSC = {
-    "format": "json",
-    "starttime": start_time.strftime("%Y-%m-%dT%H:%M:%S"),
-    "endtime": tomorrow.strftime("%Y-%m-%dT%H:%M:%S"),
-}
+        state.last_sync_start = start_time
+        state.last_sync_end = tomorrow
+        state.last_run_at = today
+        state.save()
+
+    return {
+        "initial_sync": initial_sync,
+        "start_time": start_time,
+        "end_time": tomorrow,
+    }
 
 # ==========================================================
 
@@ -115,23 +124,122 @@ def standardize_date(value):
 
     return None
 
+CYCLE_STATS = Counter()
+_stats_lock = threading.Lock()
+
+def record_stat(key, value=1, stats=CYCLE_STATS):
+    with _stats_lock:
+        stats[key] += value
+
 # ==========================================================
 
-def get_IGN_events():
-    try:
-        response = requests.get(URL_IGN, timeout=20)
+FETCH_OVERLAP = datetime.timedelta(minutes=5)
+PENDING_FETCH_STATE = {}
+
+def get_fetch_state(source):
+    state, _ = SyncState.objects.get_or_create(key=f"fetch_{source.lower()}")
+    return state
+
+def get_updated_after(source, window):
+    if window["initial_sync"]:
+        return None
+    cursor = get_fetch_state(source).last_sync_end
+    if cursor is None or cursor < window["start_time"]:
+        return None
+    return floor_time(cursor - FETCH_OVERLAP)
+
+def get_request_hash(url, params=None):
+    key = json.dumps([url, sorted((params or {}).items())], separators=(",", ":"))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+def get_conditional_headers(state, request_hash):
+    headers = {}
+    if state.request_hash != request_hash:
+        return headers
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+    return headers
+
+def handle_feed_response(source, state, request_hash, status_code, content, headers, requested_at, pending=PENDING_FETCH_STATE, stats=CYCLE_STATS):
+    if status_code == 304:
+        record_stat("feeds_not_modified", stats=stats)
+        pending[source] = {"requested_at": requested_at}
+        return None
+
+    record_stat("bytes_downloaded", len(content), stats=stats)
+
+    content_hash = hashlib.sha256(content).hexdigest()
+    pending[source] = {
+        "requested_at": requested_at,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "content_hash": content_hash,
+        "request_hash": request_hash,
+    }
+
+    if content_hash == state.content_hash:
+        record_stat("feeds_not_modified", stats=stats)
+        return None
+    return content
+
+def fetch_feed(source, url, params=None, stats=CYCLE_STATS):
+    state = get_fetch_state(source)
+    request_hash = get_request_hash(url, params)
+    requested_at = datetime.datetime.now(datetime.UTC)
+    response = requests.get(url, params=params, headers=get_conditional_headers(state, request_hash), timeout=20)
+    if response.status_code != 304:
         response.raise_for_status()
+    return handle_feed_response(source, state, request_hash, response.status_code, response.content, response.headers, requested_at, stats=stats)
+
+def commit_fetch_state(pending=PENDING_FETCH_STATE):
+    for source, values in pending.items():
+        state = get_fetch_state(source)
+        state.value = True
+        state.last_sync_end = values["requested_at"]
+        state.last_run_at = datetime.datetime.now(datetime.UTC)
+        if "content_hash" in values:
+            state.etag = values["etag"]
+            state.last_modified = values["last_modified"]
+            state.content_hash = values["content_hash"]
+            state.request_hash = values["request_hash"]
+        state.save()
+    pending.clear()
+
+def get_IGN_params(window):
+    return None
 
-        match = re.search(r"var\s+dias3\s*=\s*({.*?});", response.text, re.DOTALL)
-        if not match:
-            print("[!] IGN JSON block not found")
-            return []
+def get_USGS_params(window):
+    params = {
+        "format": "geojson",
+        "starttime": window["start_time"].isoformat(),
+        "endtime": window["end_time"].isoformat(),
+    }
+    updated_after = get_updated_after("USGS", window)
+    if updated_after:
+        params["updatedafter"] = updated_after.isoformat()
+    return params
+
+def get_EMSC_params(window):
+    params = {
+        "format": "json",
+        "starttime": window["start_time"].strftime("%Y-%m-%dT%H:%M:%S"),
+        "endtime": window["end_time"].strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    updated_after = get_updated_after("EMSC", window)
+    if updated_after:
+        params["updatedafter"] = updated_after.strftime("%Y-%m-%dT%H:%M:%S")
+    return params
 
-        data = json.loads(match.group(1))
-    except Exception as e:
-        print(f"[!] Error fetching IGN data: {e}")
+def parse_IGN_payload(content):
+    match = re.search(r"var\s+dias3\s*=\s*({.*?});", content.decode("utf-8", errors="replace"), re.DOTALL)
+    if not match:
+        print("[!] IGN JSON block not found")
         return []
 
+    data = json.loads(match.group(1))
+
     retrieved_time_utc = standardize_date(datetime.datetime.now(datetime.UTC))
     events = []
 
@@ -162,14 +270,8 @@ def get_IGN_events():
         })
     return events
 
-def get_USGS_events():
-    try:
-        response = requests.get(URL_USGS, params=params_USGS, timeout=20)
-        response.raise_for_status()
-        data = response.json()
-    except Exception as e:
-        print(f"[!] Error fetching USGS data: {e}")
-        return []
+def parse_USGS_payload(content):
+    data = json.loads(content)
 
     retrieved_time_utc = standardize_date(datetime.datetime.now(datetime.UTC))
     events = []
@@ -204,14 +306,8 @@ def get_USGS_events():
         })
     return events
 
-def get_EMSC_events():
-    try:
-        response = requests.get(URL_EMSC, params=params_EMSC, timeout=20)
-        response.raise_for_status()
-        data = response.json()
-    except Exception as e:
-        print(f"[!] Error fetching EMSC data: {e}")
-        return []
+def parse_EMSC_payload(content):
+    data = json.loads(content)
 
     retrieved_time_utc = standardize_date(datetime.datetime.now(datetime.UTC))
     events = []
@@ -244,23 +340,67 @@ def get_EMSC_events():
         })
     return events
 
+FEEDS = {
+    "USGS": (URL_USGS, get_USGS_params, parse_USGS_payload),
+    "IGN": (URL_IGN, get_IGN_params, parse_IGN_payload),
+    "EMSC": (URL_EMSC, get_EMSC_params, parse_EMSC_payload),
+}
+
+def get_feed_events(source, window, stats=CYCLE_STATS):
+    url, get_params, parse = FEEDS[source]
+    try:
+        content = fetch_feed(source, url, params=get_params(window), stats=stats)
+        if content is None:
+            return []
+        return parse(content)
+    except Exception as e:
+        PENDING_FETCH_STATE.pop(source, None)
+        print(f"[!] Error fetching {source} data: {e}")
+        return []
+
+def get_IGN_events(window, stats=CYCLE_STATS):
+    return get_feed_events("IGN", window, stats)
+
+def get_USGS_events(window, stats=CYCLE_STATS):
+    return get_feed_events("USGS", window, stats)
+
+def get_EMSC_events(window, stats=CYCLE_STATS):
+    return get_feed_events("EMSC", window, stats)
+
 # ==========================================================
 
-def get_tectonic_plate(event_coords):
+def get_tectonic_plate_db(event_coords):
     point = Point(event_coords[0], event_coords[1], srid=4326)
     match = Plate.objects.filter(geom__intersects=point).first()
     if not match:
         return None
     return match.platename or match.code or None
 
-def get_origin_country(event_coords):
+def get_origin_country_db(event_coords):
     point = Point(event_coords[0], event_coords[1], srid=4326)
     match = Country.objects.filter(geom__intersects=point).first()
     if not match:
         return None
     return match.admin or match.sovereignt or None
 
-def get_affected_countries(contours):
+def get_tectonic_plate(event_coords):
+    if not LOCAL_SPATIAL_INDEX:
+        return get_tectonic_plate_db(event_coords)
+    return spatial_index.lookup_plate(event_coords[0], event_coords[1])
+
+def get_origin_country(event_coords):
+    if not LOCAL_SPATIAL_INDEX:
+        return get_origin_country_db(event_coords)
+    return spatial_index.lookup_country(event_coords[0], event_coords[1])
+
+AFFECTED_COUNTRIES_SQL = """
+SELECT DISTINCT ON (p.idx) COALESCE(c.admin, c.sovereignt)
+FROM unnest(%(lons)s::float8[], %(lats)s::float8[]) WITH ORDINALITY AS p(lon, lat, idx)
+JOIN {countries} c ON ST_Intersects(c.geom, ST_SetSRID(ST_MakePoint(p.lon, p.lat), 4326))
+ORDER BY p.idx, c.ogc_fid
+"""
+
+def get_affected_countries_per_vertex(contours):
     points = []
     for _, coords in contours:
         for polygon in coords:
@@ -275,45 +415,82 @@ def get_affected_countries(contours):
 
     return list(filter(None, countries))
 
-def get_intensity_contours(source_id):
+def get_affected_countries(contours):
+    vertices = [(lon, lat) for _, coords in contours for polygon in coords for lon, lat in polygon]
+    unique_vertices = list(dict.fromkeys(vertices))
+
+    if LOCAL_SPATIAL_INDEX:
+        countries = {spatial_index.lookup_country(lon, lat) for lon, lat in unique_vertices}
+        queries = 0
+    else:
+        countries = set()
+        queries = 0
+        if unique_vertices:
+            sql = AFFECTED_COUNTRIES_SQL.format(countries=connection.ops.quote_name(Country._meta.db_table))
+            with connection.cursor() as cursor:
+                cursor.execute(sql, {
+                    "lons": [lon for lon, _ in unique_vertices],
+                    "lats": [lat for _, lat in unique_vertices],
+                })
+                countries = {row[0] for row in cursor.fetchall()}
+            queries = 1
+
+    record_stat("country_lookups_saved", len(vertices) - queries)
+    return list(filter(None, countries))
+
+def get_shakemap_detail_url(source_id):
     event_id = source_id.split("_", 1)[1] if source_id.startswith("USGS_") else source_id
-    detail_url = f"https://earthquake.usgs.gov/fdsnws/event/1/query?eventid={event_id}&format=geojson"
+    return f"https://earthquake.usgs.gov/fdsnws/event/1/query?eventid={event_id}&format=geojson"
+
+def find_contour_url(detail_text):
+    curve_match = re.findall(r"https://[^\s\"']+cont_mmi\.json", detail_text)
+    return curve_match[0] if curve_match else None
+
+def parse_contours(curve_data):
+    return [
+        (feature["properties"]["value"], feature["geometry"]["coordinates"])
+        for feature in curve_data.get("features", [])
+    ]
+
+def get_intensity_contours(source_id):
     try:
-        detail_data = requests.get(detail_url, timeout=20).json()
-        curve_match = re.findall(r"https://[^\s\"']+cont_mmi\.json", json.dumps(detail_data))
-        if not curve_match:
+        detail_data = requests.get(get_shakemap_detail_url(source_id), timeout=20).json()
+        curve_url = find_contour_url(json.dumps(detail_data))
+        if not curve_url:
             return []
-        curve_url = curve_match[0]
         curve_data = requests.get(curve_url, timeout=20).json()
-        return [
-            (feature["properties"]["value"], feature["geometry"]["coordinates"])
-            for feature in curve_data.get("features", [])
-        ]
+        return parse_contours(curve_data)
     except Exception as e:
         print(f"[!] Error fetching MMI contours for {source_id}: {e}")
         return []
 
 # ==========================================================
 
-def enrich_event_metadata(event):
+def enrich_event_metadata(event, known_location=None):
     lon, lat = event["longitude"], event["latitude"]
 
-    try:
-        event["tectonic_plate"] = get_tectonic_plate((lon, lat))
-    except Exception as e:
-        print(f"[!] Error assigning tectonic plate: {e}")
-        event["tectonic_plate"] = None
+    if known_location is not None:
+        event["tectonic_plate"], event["origin_country"] = known_location
+    else:
+        try:
+            event["tectonic_plate"] = get_tectonic_plate((lon, lat))
+        except Exception as e:
+            print(f"[!] Error assigning tectonic plate: {e}")
+            event["tectonic_plate"] = None
 
-    try:
-        event["origin_country"] = get_origin_country((lon, lat))
-    except Exception as e:
-        print(f"[!] Error assigning origin country: {e}")
-        event["origin_country"] = None
+        try:
+            event["origin_country"] = get_origin_country((lon, lat))
+        except Exception as e:
+            print(f"[!] Error assigning origin country: {e}")
+            event["origin_country"] = None
 
     event["affected_countries"] = []
     if event.get("has_shakemap") and event.get("source_id"):
         try:
-            contours = get_intensity_contours(event["source_id"])
+            if "prefetched_contours" in event:
+                contours = event.pop("prefetched_contours")
+            else:
+                contours = get_intensity_contours(event["source_id"])
             if contours:
                 affected = get_affected_countries(contours)
                 event["affected_countries"] = affected if affected else []
@@ -323,26 +500,77 @@ def enrich_event_metadata(event):
 
     return event
 
+def event_fingerprint(event_info):
+    def rounded(value, digits):
+        value = safe_float(value)
+        return None if value is None else round(value, digits)
+
+    origin = standardize_date(event_info.get("origin_time_utc"))
+    depth = rounded(event_info.get("depth_km"), 2)
+    values = [
+        origin.isoformat() if origin else None,
+        rounded(event_info.get("latitude"), 4),
+        rounded(event_info.get("longitude"), 4),
+        abs(depth) if depth is not None else None,
+        rounded(event_info.get("magnitude"), 2),
+        event_info.get("mag_type") or None,
+        event_info.get("place_name") or None,
+        safe_bool(event_info.get("tsunami")),
+        safe_bool(event_info.get("has_shakemap")),
+    ]
+    return hashlib.sha256(json.dumps(values, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def normalize_event(event_info, updated_dt, absolute_depth=False):
+    depth_val = safe_float(event_info.get("depth_km"))
+
+    event_info["latitude"] = safe_float(event_info.get("latitude"))
+    event_info["longitude"] = safe_float(event_info.get("longitude"))
+    event_info["depth_km"] = abs(depth_val) if absolute_depth and depth_val is not None else depth_val
+    event_info["magnitude"] = safe_float(event_info.get("magnitude"))
+    event_info["tsunami"] = safe_bool(event_info.get("tsunami"))
+    event_info["has_shakemap"] = safe_bool(event_info.get("has_shakemap"))
+    event_info["origin_time_utc"] = standardize_date(event_info.get("origin_time_utc"))
+    event_info["updated_time_utc"] = updated_dt
+    event_info["retrieved_time_utc"] = standardize_date(event_info.get("retrieved_time_utc"))
+    event_info["place_name"] = event_info.get("place_name") or None
+    event_info["mag_type"] = event_info.get("mag_type") or None
+    return event_info
+
+def build_earthquake(event_info, payload_id=None):
+    lat, lon = event_info.get("latitude"), event_info.get("longitude")
+    return Earthquake(
+        global_id=event_info.get("global_id"),
+        source=event_info.get("source"),
+        source_id=event_info.get("source_id"),
+        origin_time=event_info.get("origin_time_utc"),
+        latitude=lat,
+        longitude=lon,
+        location=Point(lon, lat) if lat is not None and lon is not None else None,
+        place_name=event_info.get("place_name"),
+        depth_km=event_info.get("depth_km"),
+        magnitude=event_info.get("magnitude"),
+        mag_type=event_info.get("mag_type"),
+        tectonic_plate=event_info.get("tectonic_plate"),
+        origin_country=event_info.get("origin_country"),
+        affected_countries=event_info.get("affected_countries", []),
+        updated_time=event_info.get("updated_time_utc"),
+        retrieved_time=event_info.get("retrieved_time_utc"),
+        tsunami=event_info.get("tsunami"),
+        has_curves=event_info.get("has_shakemap"),
+        raw_payload_id=payload_id,
+        content_fingerprint=event_info.get("content_fingerprint"),
+    )
+
 def create_event(event_info, source):
     global_id = event_info.get("global_id")
     existing = Earthquake.objects.filter(global_id=global_id).first()
 
     updated_dt = standardize_date(event_info.get("updated_time_utc"))
+    event_info["content_fingerprint"] = event_fingerprint(event_info)
     if existing:
-        if updated_dt and (existing.updated_time is None or updated_dt > existing.updated_time):
-            event_info["latitude"] = safe_float(event_info.get("latitude"))
-            event_info["longitude"] = safe_float(event_info.get("longitude"))
-            depth_val = safe_float(event_info.get("depth_km"))
-            event_info["depth_km"] = abs(depth_val) if depth_val is not None else None
-            event_info["magnitude"] = safe_float(event_info.get("magnitude"))
-            event_info["tsunami"] = safe_bool(event_info.get("tsunami"))
-            event_info["has_shakemap"] = safe_bool(event_info.get("has_shakemap"))
-            event_info["origin_time_utc"] = standardize_date(event_info.get("origin_time_utc"))
-            event_info["retrieved_time_utc"] = standardize_date(event_info.get("retrieved_time_utc"))
-            event_info["place_name"] = event_info.get("place_name") or None
-            event_info["mag_type"] = event_info.get("mag_type") or None
-
-            event_info = enrich_event_metadata(event_info)
+        if classify_change(event_info, existing.updated_time, existing.content_fingerprint) == "updated":
+            current = {field: getattr(existing, field) for field in EXISTING_FIELDS}
+            event_info = prepare_event(event_info, "updated", current)
 
             for field, value in {
                 "origin_time": event_info.get("origin_time_utc"),
@@ -359,26 +587,24 @@ def create_event(event_info, source):
                 "retrieved_time": event_info.get("retrieved_time_utc"),
                 "tsunami": event_info.get("tsunami"),
                 "has_curves": event_info.get("has_shakemap"),
-                "raw_data": event_info.get("raw_data") or {},
+                "raw_payload_id": provenance.store_payloads([event_info]).get(global_id),
+                "content_fingerprint": event_info["content_fingerprint"],
             }.items():
                 setattr(existing, field, value)
 
             existing.save()
             return existing, "updated"
-        return existing, "unchanged"
 
-    event_info["latitude"] = safe_float(event_info.get("latitude"))
-    event_info["longitude"] = safe_float(event_info.get("longitude"))
-    event_info["depth_km"] = safe_float(event_info.get("depth_km"))
-    event_info["magnitude"] = safe_float(event_info.get("magnitude"))
-    event_info["tsunami"] = safe_bool(event_info.get("tsunami"))
-    event_info["has_shakemap"] = safe_bool(event_info.get("has_shakemap"))
-    event_info["origin_time_utc"] = standardize_date(event_info.get("origin_time_utc"))
-    event_info["updated_time_utc"] = updated_dt
-    event_info["retrieved_time_utc"] = standardize_date(event_info.get("retrieved_time_utc"))
-    event_info["place_name"] = event_info.get("place_name") or None
-    event_info["mag_type"] = event_info.get("mag_type") or None
+        if event_info.get("write_avoided"):
+            existing.updated_time = updated_dt
+            existing.retrieved_time = event_info.get("retrieved_time_utc")
+            existing.save(update_fields=["updated_time", "retrieved_time"])
+            record_stat("timestamps_refreshed")
+            record_stat("writes_avoided")
+            record_stat("enrichments_avoided")
+        return existing, "unchanged"
 
+    event_info = normalize_event(event_info, updated_dt)
     event_info = enrich_event_metadata(event_info)
 
     try:
@@ -401,7 +627,8 @@ def create_event(event_info, source):
                 retrieved_time=event_info.get("retrieved_time_utc"),
                 tsunami=event_info.get("tsunami"),
                 has_curves=event_info.get("has_shakemap"),
-                raw_data=event_info.get("raw_data") or {},
+                raw_payload_id=provenance.store_payloads([event_info]).get(global_id),
+                content_fingerprint=event_info.get("content_fingerprint"),
             )
     except IntegrityError:
         print(f"[!] Skipped duplicate event {event_info.get('source_id')}.")
@@ -419,15 +646,34 @@ def create_event(event_info, source):
 
     return event, "new"
 
-def process_events(event_data):
+def get_tile_points(events):
+    points = []
+    for event_info in events:
+        points.append((event_info.get("longitude"), event_info.get("latitude")))
+        if "previous_location" in event_info:
+            points.append(event_info["previous_location"])
+    return points
+
+def get_changed_times(events):
+    times = []
+    for event_info in events:
+        times.append(event_info.get("origin_time_utc"))
+        if "previous_origin_time" in event_info:
+            times.append(event_info["previous_origin_time"])
+    return times
+
+def process_events(event_data, written=None):
     counts = {"new": 0, "updated": 0, "unchanged": 0}
 
     def handle_event(event_info):
         try:
             _, status = create_event(event_info, event_info.get("source"))
+            if written is not None and status in ("new", "updated"):
+                written.append(event_info)
             return status
         except Exception as e:
             print(f"[!] Error processing {event_info.get('source_id', 'unknown')}: {e}")
+            record_stat("write_errors")
             return "error"
 
     with ThreadPoolExecutor(max_workers=4) as executor:
@@ -439,15 +685,293 @@ def process_events(event_data):
 
     return counts["new"], counts["updated"], counts["unchanged"]
 
+UPSERT_FIELDS = [
+    "origin_time", "latitude", "longitude", "location", "place_name", "depth_km",
+    "magnitude", "mag_type", "tectonic_plate", "origin_country", "affected_countries",
+    "updated_time", "retrieved_time", "tsunami", "has_curves", "raw_payload", "content_fingerprint",
+]
+
+EXISTING_FIELDS = ["updated_time", "content_fingerprint", "origin_time", "latitude", "longitude", "tectonic_plate", "origin_country"]
+
+TOUCH_EVENTS_SQL = """
+UPDATE {earthquake} e
+SET updated_time = t.updated_time, retrieved_time = t.retrieved_time
+FROM unnest(%s::varchar[], %s::timestamptz[], %s::timestamptz[]) AS t(global_id, updated_time, retrieved_time)
+WHERE e.global_id = t.global_id
+  AND (e.updated_time IS NULL OR e.updated_time < t.updated_time)
+"""
+
+def touch_events(events):
+    if not events:
+        return 0
+
+    sql = TOUCH_EVENTS_SQL.format(earthquake=connection.ops.quote_name(Earthquake._meta.db_table))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [
+            [e.get("global_id") for e in events],
+            [standardize_date(e.get("updated_time_utc")) for e in events],
+            [e.get("retrieved_time_utc") for e in events],
+        ])
+        return cursor.rowcount
+
+def get_existing_events(global_ids, batch_size=1000):
+    existing = {}
+    global_ids = list(global_ids)
+    for k in range(0, len(global_ids), batch_size):
+        for row in (
+            Earthquake.objects.filter(global_id__in=global_ids[k:k + batch_size])
+            .values("global_id", *EXISTING_FIELDS)
+        ):
+            existing[row.pop("global_id")] = row
+    return existing
+
+def classify_change(event_info, current_updated, current_fingerprint):
+    updated_dt = standardize_date(event_info.get("updated_time_utc"))
+    advanced = bool(updated_dt and (current_updated is None or updated_dt > current_updated))
+    event_info["write_avoided"] = False
+
+    if current_fingerprint is None:
+        return "updated" if advanced else "unchanged"
+    if event_info["content_fingerprint"] == current_fingerprint:
+        event_info["write_avoided"] = advanced
+        return "unchanged"
+    if updated_dt and current_updated and updated_dt < current_updated:
+        return "unchanged"
+    return "updated"
+
+def classify_event(event_info, existing):
+    event_info["content_fingerprint"] = event_fingerprint(event_info)
+    global_id = event_info.get("global_id")
+    if global_id not in existing:
+        return "new"
+
+    current = existing[global_id]
+    return classify_change(event_info, current["updated_time"], current["content_fingerprint"])
+
+def same_location(event_info, current):
+    lat, lon = safe_float(event_info.get("latitude")), safe_float(event_info.get("longitude"))
+    return (
+        current is not None and lat is not None and lon is not None
+        and current["latitude"] is not None and current["longitude"] is not None
+        and round(lat, 4) == round(current["latitude"], 4)
+        and round(lon, 4) == round(current["longitude"], 4)
+    )
+
+def prepare_event(event_info, status, current=None):
+    updated_dt = standardize_date(event_info.get("updated_time_utc"))
+    event_info = normalize_event(event_info, updated_dt, absolute_depth=(status == "updated"))
+    if status == "updated" and current is not None:
+        event_info["previous_location"] = (current["longitude"], current["latitude"])
+        event_info["previous_origin_time"] = current["origin_time"]
+    if status == "updated" and same_location(event_info, current):
+        record_stat("enrichments_avoided")
+        return enrich_event_metadata(event_info, known_location=(current["tectonic_plate"], current["origin_country"]))
+    return enrich_event_metadata(event_info)
+
+def write_partitioned_chunk(objs):
+    reserved = partitioning.reserve_global_ids(obj.global_id for obj in objs)
+    created, updated = [], []
+    for obj in objs:
+        obj.pk, is_new = reserved[obj.global_id]
+        (created if is_new else updated).append(obj)
+
+    Earthquake.objects.bulk_create(created)
+    Earthquake.objects.bulk_update(updated, UPSERT_FIELDS)
+
+def process_events_batch(event_data, batch_size=500, existing=None, written=None):
+    counts = {"new": 0, "updated": 0, "unchanged": 0}
+
+    if existing is None:
+        existing = get_existing_events(e.get("global_id") for e in event_data)
+
+    pending, touched = [], []
+    for event_info in event_data:
+        status = classify_event(event_info, existing)
+        if status == "unchanged":
+            counts["unchanged"] += 1
+            if event_info.get("write_avoided"):
+                touched.append(event_info)
+                record_stat("writes_avoided")
+                record_stat("enrichments_avoided")
+        else:
+            pending.append((event_info, status))
+
+    try:
+        record_stat("timestamps_refreshed", touch_events(touched))
+    except Exception as e:
+        print(f"[!] Error refreshing timestamps of {len(touched)} unchanged events: {e}")
+        record_stat("write_errors")
+
+    def handle_event(item):
+        event_info, status = item
+        try:
+            return prepare_event(event_info, status, existing.get(event_info.get("global_id"))), status
+        except Exception as e:
+            print(f"[!] Error processing {event_info.get('source_id', 'unknown')}: {e}")
+            record_stat("write_errors")
+            return None, "error"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        prepared = [(e, status) for e, status in executor.map(handle_event, pending) if e is not None]
+
+    for k in range(0, len(prepared), batch_size):
+        chunk = prepared[k:k + batch_size]
+
+        try:
+            with transaction.atomic():
+                payload_ids = provenance.store_payloads([e for e, _ in chunk])
+                objs = [build_earthquake(e, payload_ids.get(e.get("global_id"))) for e, _ in chunk]
+
+                if partitioning.is_partitioned():
+                    write_partitioned_chunk(objs)
+                else:
+                    Earthquake.objects.bulk_create(
+                        objs,
+                        update_conflicts=True,
+                        unique_fields=["global_id"],
+                        update_fields=UPSERT_FIELDS,
+                    )
+
+                curves = []
+                for obj, (event_info, status) in zip(objs, chunk):
+                    if status == "new" and event_info.get("has_shakemap") and "intensity_contours" in event_info:
+                        curves.extend(
+                            IntensityCurve(earthquake_id=obj.pk, intensity=safe_float(intensity), coordinates=coordinates)
+                            for intensity, coordinates in event_info["intensity_contours"]
+                        )
+                IntensityCurve.objects.bulk_create(curves, batch_size=batch_size)
+        except Exception as e:
+            print(f"[!] Error writing batch of {len(chunk)} events: {e}")
+            record_stat("write_errors")
+            continue
+
+        for event_info, status in chunk:
+            counts[status] += 1
+            if written is not None:
+                written.append(event_info)
+
+    return counts["new"], counts["updated"], counts["unchanged"]
+
 # ==========================================================
 
-def mark_duplicates(dt_threshold=8, dd_threshold=8, dm_threshold=0.7, source_priority={"USGS": 0, "IGN": 1, "EMSC": 2}):
-    events = list(
+DEDUP_SQL = """
+WITH windows AS (
+    SELECT * FROM unnest(%(window_lo)s::timestamptz[], %(window_hi)s::timestamptz[]) AS w(lo, hi)
+),
+priorities AS (
+    SELECT * FROM unnest(%(sources)s::text[], %(priorities)s::int[]) AS p(source, priority)
+),
+candidates AS MATERIALIZED (
+    SELECT e.id, e.source, e.origin_time, e.magnitude, e.location, COALESCE(p.priority, 99) AS priority
+    FROM {earthquake} e
+    LEFT JOIN priorities p ON p.source = btrim(e.source)
+    WHERE e.duplicate_of_id IS NULL
+      AND e.location IS NOT NULL
+      AND (%(full_rebuild)s OR EXISTS (
+          SELECT 1 FROM windows w WHERE e.origin_time BETWEEN w.lo AND w.hi
+      ))
+),
+pairs AS (
+    SELECT
+        a.id AS a_id, b.id AS b_id, a.priority AS pa, b.priority AS pb,
+        EXTRACT(EPOCH FROM b.origin_time - a.origin_time) AS dt,
+        ST_Distance(a.location, b.location, false) / 1000 AS dd,
+        ABS(a.magnitude - b.magnitude) AS dm
+    FROM candidates a
+    JOIN candidates b
+      ON b.origin_time BETWEEN a.origin_time AND a.origin_time + make_interval(secs => %(dt_threshold)s)
+     AND (b.origin_time, b.id) > (a.origin_time, a.id)
+    WHERE a.source <> b.source
+      AND a.magnitude IS NOT NULL
+      AND b.magnitude IS NOT NULL
+      AND ABS(a.magnitude - b.magnitude) <= %(dm_threshold)s
+      AND ST_DWithin(a.location, b.location, %(dd_threshold)s * 1000, false)
+),
+links AS (
+    SELECT
+        CASE WHEN pa < pb THEN a_id ELSE b_id END AS canonical_id,
+        CASE WHEN pa < pb THEN b_id ELSE a_id END AS duplicate_id,
+        dt, dd, dm
+    FROM pairs
+),
+inserted AS (
+    INSERT INTO {duplicatelink} (canonical_id, duplicate_id, dt, dd, dm)
+    SELECT l.canonical_id, l.duplicate_id, l.dt, l.dd, l.dm
+    FROM links l
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {duplicatelink} d
+        WHERE d.canonical_id = l.canonical_id AND d.duplicate_id = l.duplicate_id
+    )
+    RETURNING canonical_id, duplicate_id, dd
+),
+updated AS (
+    UPDATE {earthquake} e
+    SET duplicate_of_id = i.canonical_id
+    FROM (
+        SELECT DISTINCT ON (duplicate_id) duplicate_id, canonical_id
+        FROM inserted
+        ORDER BY duplicate_id, dd
+    ) i
+    WHERE e.id = i.duplicate_id
+    RETURNING e.id
+)
+SELECT COUNT(*) FROM inserted
+"""
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    lon1, lat1, lon2, lat2 = map(math.radians, (lon1, lat1, lon2, lat2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def get_dedup_windows(origin_times, dt_threshold):
+    margin = datetime.timedelta(seconds=dt_threshold)
+    windows = []
+    for t in sorted(origin_times):
+        lo, hi = t - margin, t + margin
+        if windows and lo <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], hi)
+        else:
+            windows.append([lo, hi])
+    return windows
+
+def get_dedup_scope(dt_threshold, full_rebuild=False):
+    state, _ = SyncState.objects.get_or_create(key="dedup_high_water_mark")
+    high_water_mark = state.last_sync_end
+
+    if full_rebuild or high_water_mark is None:
+        new_mark = Earthquake.objects.aggregate(m=Max("retrieved_time"))["m"]
+        return None, state, new_mark
+
+    touched = list(
+        Earthquake.objects.filter(retrieved_time__gt=high_water_mark)
+        .values_list("origin_time", "retrieved_time")
+    )
+    if not touched:
+        return [], state, high_water_mark
+
+    new_mark = max(r for _, r in touched)
+    return get_dedup_windows([t for t, _ in touched], dt_threshold), state, new_mark
+
+def get_dedup_candidates(windows):
+    base = (
         Earthquake.objects.filter(duplicate_of__isnull=True)
         .exclude(location__isnull=True)
-        .order_by("origin_time")
     )
 
+    if windows is None:
+        return list(base.order_by("origin_time"))
+    if not windows:
+        return []
+
+    window_filter = Q()
+    for lo, hi in windows:
+        window_filter |= Q(origin_time__gte=lo, origin_time__lte=hi)
+
+    return list(base.filter(window_filter).order_by("origin_time"))
+
+def mark_duplicates_python(windows, dt_threshold, dd_threshold, dm_threshold, source_priority):
+    events = get_dedup_candidates(windows)
+
     total_links = 0
     total_checked = 0
     n = len(events)
@@ -476,7 +1000,7 @@ def mark_duplicates(dt_threshold=8, dd_threshold=8, dm_threshold=0.7, source_pri
                 continue
 
             try:
-                dd = event_a.location.distance(event_b.location) / 1000
+                dd = haversine_km(event_a.longitude, event_a.latitude, event_b.longitude, event_b.latitude)
             except Exception:
                 continue
 
@@ -513,7 +1037,150 @@ def mark_duplicates(dt_threshold=8, dd_threshold=8, dm_threshold=0.7, source_pri
 
     return total_links
 
-def fetch_all_events():
+def mark_duplicates_sql(windows, dt_threshold, dd_threshold, dm_threshold, source_priority):
+    if windows == []:
+        return 0
+
+    sql = DEDUP_SQL.format(
+        earthquake=connection.ops.quote_name(Earthquake._meta.db_table),
+        duplicatelink=connection.ops.quote_name(DuplicateLink._meta.db_table),
+    )
+    params = {
+        "window_lo": [lo for lo, _ in windows or []],
+        "window_hi": [hi for _, hi in windows or []],
+        "full_rebuild": windows is None,
+        "sources": list(source_priority.keys()),
+        "priorities": list(source_priority.values()),
+        "dt_threshold": float(dt_threshold),
+        "dd_threshold": float(dd_threshold),
+        "dm_threshold": float(dm_threshold),
+    }
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
+
+def find_duplicates_numpy(windows, dt_threshold, dd_threshold, dm_threshold, source_priority, chunk_size=50000):
+    queryset = (
+        Earthquake.objects.filter(duplicate_of__isnull=True)
+        .exclude(location__isnull=True)
+    )
+    if windows is not None:
+        if not windows:
+            return []
+        window_filter = Q()
+        for lo, hi in windows:
+            window_filter |= Q(origin_time__gte=lo, origin_time__lte=hi)
+        queryset = queryset.filter(window_filter)
+
+    rows = list(
+        queryset.values_list("id", "origin_time", "longitude", "latitude", "magnitude", "source")
+        .iterator(chunk_size=chunk_size)
+    )
+    if len(rows) < 2:
+        return []
+
+    ids, times, lons, lats, mags, sources = zip(*rows)
+    ids = np.array(ids, dtype=np.int64)
+    t = np.array([o.timestamp() for o in times], dtype=np.float64)
+    lon = np.radians(np.array(lons, dtype=np.float64))
+    lat = np.radians(np.array(lats, dtype=np.float64))
+    mag = np.array([np.nan if m is None else m for m in mags], dtype=np.float64)
+    source_names, src = np.unique(np.array([s or "" for s in sources], dtype=object), return_inverse=True)
+    prio = np.array([source_priority.get(s.strip(), 99) for s in source_names], dtype=np.int64)[src]
+
+    order = np.lexsort((ids, t))
+    ids, t, lon, lat, mag, src, prio = (a[order] for a in (ids, t, lon, lat, mag, src, prio))
+
+    idx = np.arange(len(t))
+    span = np.searchsorted(t, t + dt_threshold, side="right") - idx
+
+    pairs = []
+    for k in range(1, int(span.max())):
+        i = idx[span > k]
+        j = i + k
+
+        keep = (src[i] != src[j]) & ~np.isnan(mag[i]) & ~np.isnan(mag[j])
+        i, j = i[keep], j[keep]
+        dm = np.abs(mag[i] - mag[j])
+        keep = dm <= dm_threshold
+        i, j, dm = i[keep], j[keep], dm[keep]
+        if not len(i):
+            continue
+
+        a = np.sin((lat[j] - lat[i]) / 2) ** 2 + np.cos(lat[i]) * np.cos(lat[j]) * np.sin((lon[j] - lon[i]) / 2) ** 2
+        dd = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+        keep = dd <= dd_threshold
+        i, j, dm, dd = i[keep], j[keep], dm[keep], dd[keep]
+
+        a_first = prio[i] < prio[j]
+        canonical = np.where(a_first, ids[i], ids[j])
+        duplicate = np.where(a_first, ids[j], ids[i])
+        dt = t[j] - t[i]
+        pairs.extend(zip(canonical.tolist(), duplicate.tolist(), dt.tolist(), dd.tolist(), dm.tolist()))
+
+    return pairs
+
+def mark_duplicates_numpy(windows, dt_threshold, dd_threshold, dm_threshold, source_priority, batch_size=1000):
+    pairs = find_duplicates_numpy(windows, dt_threshold, dd_threshold, dm_threshold, source_priority)
+    if not pairs:
+        return 0
+
+    duplicate_ids = {d for _, d, _, _, _ in pairs}
+    existing = set()
+    id_list = list(duplicate_ids)
+    for k in range(0, len(id_list), batch_size):
+        existing.update(
+            DuplicateLink.objects.filter(duplicate_id__in=id_list[k:k + batch_size])
+            .values_list("canonical_id", "duplicate_id")
+        )
+
+    new_links = [p for p in pairs if (p[0], p[1]) not in existing]
+    if not new_links:
+        return 0
+
+    best = {}
+    for canonical, duplicate, _, dd, _ in new_links:
+        if duplicate not in best or dd < best[duplicate][1]:
+            best[duplicate] = (canonical, dd)
+
+    with transaction.atomic():
+        DuplicateLink.objects.bulk_create(
+            [DuplicateLink(canonical_id=c, duplicate_id=d, dt=dt, dd=dd, dm=dm) for c, d, dt, dd, dm in new_links],
+            batch_size=batch_size,
+        )
+        Earthquake.objects.bulk_update(
+            [Earthquake(id=d, duplicate_of_id=c) for d, (c, _) in best.items()],
+            ["duplicate_of"],
+            batch_size=batch_size,
+        )
+
+    return len(new_links)
+
+DEDUP_ENGINES = {
+    "python": mark_duplicates_python,
+    "sql": mark_duplicates_sql,
+    "numpy": mark_duplicates_numpy,
+}
+
+def mark_duplicates(dt_threshold=8, dd_threshold=8, dm_threshold=0.7, source_priority={"USGS": 0, "IGN": 1, "EMSC": 2}, full_rebuild=False, engine="sql"):
+    windows, state, new_mark = get_dedup_scope(dt_threshold, full_rebuild=full_rebuild)
+    last_link = DuplicateLink.objects.aggregate(m=Max("id"))["m"] or 0
+
+    total_links = DEDUP_ENGINES[engine](windows, dt_threshold, dd_threshold, dm_threshold, source_priority)
+    if total_links:
+        statistics.record_changed_days(
+            DuplicateLink.objects.filter(id__gt=last_link).values_list("duplicate__origin_time", flat=True)
+        )
+
+    state.value = True
+    state.last_sync_end = new_mark
+    state.last_run_at = datetime.datetime.now(datetime.UTC)
+    state.save()
+
+    return total_links
+
+def fetch_all_events(window, stats=CYCLE_STATS):
     sources = {
         "USGS": get_USGS_events,
         "IGN": get_IGN_events,
@@ -522,7 +1189,7 @@ def fetch_all_events():
 
     events_by_source = {}
     with ThreadPoolExecutor(max_workers=3) as executor:
-        future_to_source = {executor.submit(func): name for name, func in sources.items()}
+        future_to_source = {executor.submit(func, window, stats): name for name, func in sources.items()}
 
         for future in as_completed(future_to_source):
             name = future_to_source[future]
@@ -537,26 +1204,254 @@ def fetch_all_events():
 
     return all_events
 
-# ==========================================================
+class AsyncFetcher:
+    def __init__(self, max_per_host=4, timeout=20, retries=3, backoff=1.0, transport=None):
+        self.max_per_host = max_per_host
+        self.transport = transport
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.client = None
+        self.semaphores = {}
+
+    def get_client(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                follow_redirects=True,
+                transport=self.transport,
+            )
+        return self.client
 
-if __name__ == "__main__":
-    start = datetime.datetime.now(datetime.UTC)
-    print(f"[*] Scheduled task triggered at {start}")
+    async def get(self, url, params=None, headers=None):
+        host = httpx.URL(url).host
+        semaphore = self.semaphores.setdefault(host, asyncio.Semaphore(self.max_per_host))
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    response = await self.get_client().get(url, params=params, headers=headers)
+                if response.status_code != 429 and response.status_code < 500:
+                    return response
+                if attempt == self.retries:
+                    response.raise_for_status()
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+class AsyncAcquisition:
+    def __init__(self, **fetcher_options):
+        self.loop = asyncio.new_event_loop()
+        self.fetcher = AsyncFetcher(**fetcher_options)
+
+    def close(self):
+        self.loop.run_until_complete(self.fetcher.aclose())
+        self.loop.close()
+
+    async def download_feed(self, source, url, params, headers):
+        requested_at = datetime.datetime.now(datetime.UTC)
+        response = await self.fetcher.get(url, params=params, headers=headers)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response.status_code, response.content, response.headers, requested_at
+
+    async def download_feeds(self, specs):
+        results = await asyncio.gather(
+            *(self.download_feed(source, *spec) for source, spec in specs.items()),
+            return_exceptions=True,
+        )
+        return dict(zip(specs, results))
+
+    def fetch_events(self, window, sources=None, pending=PENDING_FETCH_STATE, stats=CYCLE_STATS):
+        sources = list(sources or FEEDS)
+        states = {source: get_fetch_state(source) for source in sources}
+        specs, request_hashes = {}, {}
+        for source in sources:
+            url, get_params, _ = FEEDS[source]
+            params = get_params(window)
+            request_hashes[source] = get_request_hash(url, params)
+            specs[source] = (url, params, get_conditional_headers(states[source], request_hashes[source]))
+
+        downloads = self.loop.run_until_complete(self.download_feeds(specs))
+
+        all_events = []
+        for source, result in downloads.items():
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                content = handle_feed_response(source, states[source], request_hashes[source], *result, pending=pending, stats=stats)
+                if content is not None:
+                    all_events.extend(FEEDS[source][2](content))
+            except Exception as e:
+                pending.pop(source, None)
+                print(f"[!] Error fetching {source} data: {e}")
+        return all_events
 
-    all_events = fetch_all_events()
+    async def download_contours(self, source_id):
+        try:
+            detail = await self.fetcher.get(get_shakemap_detail_url(source_id))
+            detail.raise_for_status()
+            curve_url = find_contour_url(json.dumps(detail.json()))
+            if not curve_url:
+                return []
+            curves = await self.fetcher.get(curve_url)
+            curves.raise_for_status()
+            return parse_contours(curves.json())
+        except Exception as e:
+            print(f"[!] Error fetching MMI contours for {source_id}: {e}")
+            return []
+
+    async def download_all_contours(self, source_ids):
+        results = await asyncio.gather(*(self.download_contours(source_id) for source_id in source_ids))
+        return dict(zip(source_ids, results))
+
+    def prefetch_contours(self, events, existing):
+        pending = [
+            e for e in events
+            if e.get("has_shakemap") and e.get("source_id") and classify_event(e, existing) != "unchanged"
+        ]
+        if not pending:
+            return
 
+        contours = self.loop.run_until_complete(
+            self.download_all_contours([e["source_id"] for e in pending])
+        )
+        for event in pending:
+            event["prefetched_contours"] = contours[event["source_id"]]
+
+# ==========================================================
+
+def unique_by_global_id(all_events):
     all_events.sort(key=lambda e: (e.get("global_id"), e.get("updated_time_utc")),reverse=True)
     unique_events = []
     for gid, group in groupby(all_events, key=itemgetter("global_id")):
         first = next(group)
         unique_events.append(first)
+    return unique_events
+
+def store_events(all_events, acquisition=None, per_event_writes=False, full_dedup=False, dedup_engine="sql", pending=PENDING_FETCH_STATE):
+    all_events = unique_by_global_id(all_events)
+
+    try:
+        created = partitioning.ensure_future_partitions()
+        if created:
+            print(f"[*] Created partitions: {', '.join(created)}")
+    except Exception as e:
+        print(f"[!] Error creating upcoming partitions: {e}")
+
+    existing = None
+    if acquisition is not None:
+        existing = get_existing_events(e.get("global_id") for e in all_events)
+        acquisition.prefetch_contours(all_events, existing)
+
+    written = []
+    if per_event_writes:
+        new_events, updated_events, unchanged = process_events(all_events, written=written)
+    else:
+        new_events, updated_events, unchanged = process_events_batch(all_events, existing=existing, written=written)
+
+    try:
+        record_stat("tiles_invalidated", tiles.invalidate_tiles(get_tile_points(written)))
+    except Exception as e:
+        print(f"[!] Error invalidating tile cache: {e}")
 
-    all_events = unique_events
+    try:
+        statistics.record_changed_days(get_changed_times(written))
+    except Exception as e:
+        print(f"[!] Error recording changed days: {e}")
+
+    if CYCLE_STATS["write_errors"]:
+        pending.clear()
+        print("[!] Some events failed to write - feed cursors were not advanced")
+    commit_fetch_state(pending)
+    total_links = mark_duplicates(full_rebuild=full_dedup, engine=dedup_engine)
+
+    try:
+        refreshed = statistics.refresh_statistics(full_rebuild=full_dedup)
+        record_stat("stats_days_refreshed", refreshed if refreshed is not None else 0)
+    except Exception as e:
+        print(f"[!] Error refreshing summary statistics: {e}")
+
+    try:
+        if full_dedup:
+            metadata.rebuild_filter_values()
+        else:
+            record_stat("new_filter_values", metadata.register_filter_values(written))
+    except Exception as e:
+        print(f"[!] Error registering filter values: {e}")
 
-    new_events, updated_events, unchanged = process_events(all_events)
-    total_links = mark_duplicates()
+    if new_events or updated_events or total_links or CYCLE_STATS["timestamps_refreshed"]:
+        caching.bump_catalog_version()
 
+    return new_events, updated_events, unchanged, total_links
+
+def save_geocode_cache():
+    if LOCAL_SPATIAL_INDEX:
+        try:
+            spatial_index.cache.save(GEOCODE_CACHE_PATH)
+        except OSError as e:
+            print(f"[!] Error saving geocode cache: {e}")
+
+def print_cycle_summary(start, new_events, updated_events, unchanged, total_links):
     end = datetime.datetime.now(datetime.UTC)
     duration = (end - start).total_seconds()
 
-    print(f"[✓] Cycle completed at {end.isoformat()} ({duration:.1f}s total) | New: {new_events} | Updated: {updated_events} | Unchanged: {unchanged} | Duplicated: {total_links}")
\ No newline at end of file
+    print(f"[✓] Cycle completed at {end.isoformat()} ({duration:.1f}s total) | New: {new_events} | Updated: {updated_events} | Unchanged: {unchanged} | Duplicated: {total_links} | Downloaded: {CYCLE_STATS['bytes_downloaded'] / 1024:.0f} kB ({CYCLE_STATS['feeds_not_modified']} feeds unchanged) | Country lookups saved: {CYCLE_STATS['country_lookups_saved']} | Geocode cache: {spatial_index.cache.hits} hits / {spatial_index.cache.misses} misses | Stats days refreshed: {CYCLE_STATS['stats_days_refreshed']} | Writes avoided: {CYCLE_STATS['writes_avoided']} ({CYCLE_STATS['timestamps_refreshed']} timestamps refreshed) | Enrichments avoided: {CYCLE_STATS['enrichments_avoided']}")
+
+    CYCLE_STATS.clear()
+    spatial_index.cache.reset_counters()
+
+def run_cycle(per_event_writes=False, threaded_fetch=False, full_dedup=False, dedup_engine="sql"):
+    start = datetime.datetime.now(datetime.UTC)
+    print(f"[*] Scheduled task triggered at {start}")
+
+    if LOCAL_SPATIAL_INDEX:
+        spatial_index.cache.load(GEOCODE_CACHE_PATH)
+
+    window = init_sync_window()
+
+    acquisition = None
+    if threaded_fetch:
+        all_events = fetch_all_events(window)
+    else:
+        acquisition = AsyncAcquisition()
+        all_events = acquisition.fetch_events(window)
+
+    try:
+        counts = store_events(
+            all_events,
+            acquisition=acquisition,
+            per_event_writes=per_event_writes,
+            full_dedup=full_dedup,
+            dedup_engine=dedup_engine,
+        )
+    finally:
+        if acquisition is not None:
+            acquisition.close()
+
+    save_geocode_cache()
+    print_cycle_summary(start, *counts)
+
+# ==========================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run one acquisition and deduplication cycle.")
+    parser.add_argument("--per-event-writes", action="store_true", help="Write events one by one with create_event instead of the batched upsert")
+    parser.add_argument("--threaded-fetch", action="store_true", help="Download feeds and shakemaps with the blocking thread-pool fetchers instead of the async client")
+    parser.add_argument("--full-dedup", action="store_true", help="Rebuild duplicate links over the whole catalog instead of the events touched since the last cycle")
+    parser.add_argument("--dedup-engine", choices=sorted(DEDUP_ENGINES), default="sql", help="Deduplication engine (sql runs a single PostGIS self-join, numpy sweeps columnar arrays in memory for large backfills, python is the reference implementation)")
+    args = parser.parse_args()
+
+    run_cycle(
+        per_event_writes=args.per_event_writes,
+        threaded_fetch=args.threaded_fetch,
+        full_dedup=args.full_dedup,
+        dedup_engine=args.dedup_engine,
+    )